@@ -1,15 +1,26 @@
 """File upload API endpoints."""
 
 from fastapi import APIRouter, HTTPException, UploadFile, File, status
+from fastapi.responses import JSONResponse
 from typing import List
 from pathlib import Path
+import logging
+import os
 
 from app.models import FileUploadResponse, FileInfo
 from app.database import get_db
-from app.utils.file_validation import validate_filename, validate_total_size, ValidationError
+from app.utils.file_validation import (
+    validate_filename, validate_total_size, validate_project_quota, ValidationError
+)
 from app.config import settings
+from app.services.cold_storage import get_cold_storage, ArchiveMissingError
+from app.services.jobs import get_job_queue
+from app.services.processing import PROCESS_PROJECT
+from app.utils.id_generator import generate_id
 
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/api/projects", tags=["files"])
 
 
@@ -26,6 +37,17 @@ async def upload_files(project_id: str, files: List[UploadFile] = File(...)):
             detail=f"Project '{project_id}' not found"
         )
 
+    # Uploads merge into existing files, so an archived project must be expanded first
+    cold_storage = get_cold_storage()
+    cold_storage.tracker.touch(project_id)
+    try:
+        await cold_storage.ensure_hydrated(project)
+    except ArchiveMissingError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
     project_dir = Path(settings.projects_dir) / project_id
     project_dir.mkdir(parents=True, exist_ok=True)
 
@@ -43,17 +65,33 @@ async def upload_files(project_id: str, files: List[UploadFile] = File(...)):
         # Validate total size
         validate_total_size(total_size)
 
-        # Process each file
-        for filename, content in file_data:
-            # Validate and sanitize filename
-            safe_filename = validate_filename(filename)
+        # Validate and sanitize filenames
+        file_data = [(validate_filename(filename), content) for filename, content in file_data]
+
+        # Check quota against trigger-maintained usage; only overwritten files are looked up
+        quota_bytes = project['quota_bytes']
+        if quota_bytes is None:
+            quota_bytes = settings.project_quota_bytes
+        if quota_bytes > 0:
+            sizes = {filename: len(content) for filename, content in file_data}
+            existing = await db.get_file_sizes(project_id, list(sizes))
+            projected = project['total_bytes'] + sum(sizes.values()) - sum(existing.values())
+            validate_project_quota(projected, quota_bytes)
 
+        # Process each file
+        for safe_filename, content in file_data:
             # Create directory structure for nested paths
             file_path = project_dir / safe_filename
             file_path.parent.mkdir(parents=True, exist_ok=True)
 
-            # Write file
-            file_path.write_bytes(content)
+            # Write a new file and swap it in, so an overwritten file that is hard-linked
+            # elsewhere (e.g. by `import --link`) keeps its original contents there
+            partial = file_path.with_name(f".{file_path.name}.{generate_id()}.upload")
+            try:
+                partial.write_bytes(content)
+                os.replace(partial, file_path)
+            finally:
+                partial.unlink(missing_ok=True)
 
             # Update database
             await db.add_file(project_id, safe_filename, len(content))
@@ -81,9 +119,18 @@ async def upload_files(project_id: str, files: List[UploadFile] = File(...)):
             detail=f"Upload failed: {str(e)}"
         )
 
+    # Hashing and checks run in the background; repeated uploads share one pending job.
+    # The files are already stored, so a queueing failure must not fail the upload
+    job_id = None
+    try:
+        job_id = (await get_job_queue().enqueue(PROCESS_PROJECT, project_id))["id"]
+    except Exception:
+        logger.exception("Failed to queue processing for project %s", project_id)
+
     return FileUploadResponse(
         uploaded=uploaded_files,
-        total_size=total_size
+        total_size=total_size,
+        job_id=job_id
     )
 
 
@@ -100,5 +147,6 @@ async def list_files(project_id: str):
             detail=f"Project '{project_id}' not found"
         )
 
+    # Trusted rows are serialized directly, skipping per-row model validation
     files = await db.list_files(project_id)
-    return [FileInfo(**f) for f in files]
+    return JSONResponse(files)
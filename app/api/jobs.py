@@ -0,0 +1,28 @@
+"""Background job API endpoints."""
+
+from fastapi import APIRouter, HTTPException, status
+
+from app.models import JobResponse, JobQueueStatusResponse
+from app.database import get_db
+from app.services.jobs import get_job_queue
+
+
+router = APIRouter(prefix="/api/jobs", tags=["jobs"])
+
+
+@router.get("", response_model=JobQueueStatusResponse)
+async def job_queue_status():
+    """Get the number of workers and jobs by status."""
+    return JobQueueStatusResponse(**await get_job_queue().status())
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(job_id: int):
+    """Get the status and result of a background job."""
+    job = await get_db().get_job(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job '{job_id}' not found"
+        )
+    return JobResponse(**job)
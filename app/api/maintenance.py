@@ -0,0 +1,85 @@
+"""Maintenance API endpoints."""
+
+import asyncio
+import json
+from typing import Any, Dict
+
+from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+
+from app.models import ReconcilerStatusResponse, BackupSnapshot, BackupStatusResponse, ProjectResponse
+from app.database import get_db
+from app.services.backup import get_backup_manager, BackupInProgressError
+from app.services.cold_storage import get_cold_storage
+from app.services.reconciler import get_reconciler
+
+
+router = APIRouter(prefix="/api/maintenance", tags=["maintenance"])
+
+
+@router.get("/reconciler", response_model=ReconcilerStatusResponse)
+async def reconciler_status(limit: int = 100):
+    """Get background reconciler progress and recent drift findings."""
+    status = await get_reconciler().status(limit=limit)
+    return ReconcilerStatusResponse(**status)
+
+
+@router.get("/backup", response_model=BackupStatusResponse)
+async def backup_status():
+    """Get backup state and the list of available snapshots."""
+    manager = get_backup_manager()
+    return BackupStatusResponse(**await asyncio.to_thread(manager.status))
+
+
+@router.post("/backup", response_model=BackupSnapshot, status_code=status.HTTP_201_CREATED)
+async def create_backup():
+    """Create an incremental snapshot of the database and project files."""
+    manager = get_backup_manager()
+    try:
+        snapshot = await asyncio.to_thread(manager.create_snapshot)
+    except BackupInProgressError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    return BackupSnapshot(**snapshot)
+
+
+@router.post("/archive/{project_id}", response_model=ProjectResponse)
+async def archive_project(project_id: str):
+    """Move a project to cold storage now instead of waiting for it to become idle."""
+    db = get_db()
+    if not await db.get_project_by_id(project_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Project '{project_id}' not found"
+        )
+
+    # Not archived if a request for the project arrives while compressing
+    await get_cold_storage().archive_project(project_id)
+    return ProjectResponse(**await db.get_project_by_id(project_id))
+
+
+def _export_line(row: Dict[str, Any]) -> str:
+    if row["type"] == "project":
+        row["archived"] = bool(row["archived"])
+    return json.dumps(row, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_catalog(chunk_size: int = Query(default=1000, ge=1, le=10000)):
+    """
+    Stream every project, then every file, as newline-delimited JSON.
+
+    Rows are read from a database cursor in chunks and written out as they
+    are read, so memory use does not grow with the size of the catalog.
+    """
+    async def lines():
+        async for rows in get_db().iter_export(chunk_size):
+            yield "".join(_export_line(row) for row in rows)
+
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="framebox-export.ndjson"'}
+    )
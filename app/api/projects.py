@@ -1,6 +1,7 @@
 """Project management API endpoints."""
 
 from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import JSONResponse
 from typing import Optional
 import shutil
 from pathlib import Path
@@ -9,6 +10,7 @@ from app.models import ProjectCreate, ProjectResponse, ProjectUpdate, ListProjec
 from app.database import get_db
 from app.utils.id_generator import generate_unique_id
 from app.config import settings
+from app.services.cold_storage import get_cold_storage
 
 
 router = APIRouter(prefix="/api/projects", tags=["projects"])
@@ -53,10 +55,11 @@ async def list_projects(search: Optional[str] = None, limit: Optional[int] = Non
     db = get_db()
     projects = await db.list_projects(search=search, limit=limit)
 
-    return ListProjectsResponse(
-        projects=[ProjectResponse(**p) for p in projects],
-        total=len(projects)
-    )
+    # Rows come from our own schema, so they are serialized directly instead of
+    # being validated into models; response_model still documents the shape
+    for p in projects:
+        p['archived'] = bool(p['archived'])
+    return JSONResponse({"projects": projects, "total": len(projects)})
 
 
 @router.get("/{id_or_name}", response_model=ProjectResponse)
@@ -107,7 +110,10 @@ async def update_project(project_id: str, update: ProjectUpdate):
     await db.update_project(
         project_id,
         name=update.name,
-        entry_file=update.entry_file
+        entry_file=update.entry_file,
+        quota_bytes=update.quota_bytes,
+        # An explicit null, unlike an omitted field, resets the quota to the instance default
+        clear_quota="quota_bytes" in update.model_fields_set and update.quota_bytes is None
     )
 
     # Get updated project
@@ -135,3 +141,6 @@ async def delete_project(project_id: str):
     project_dir = Path(settings.projects_dir) / project_id
     if project_dir.exists():
         shutil.rmtree(project_dir)
+
+    # Delete cold storage archive, if any
+    get_cold_storage().discard(project_id)
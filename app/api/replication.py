@@ -0,0 +1,100 @@
+"""Replication API endpoints: change log for replicas and replication status."""
+
+import asyncio
+from typing import IO, Iterator
+
+from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.responses import FileResponse, StreamingResponse
+from pathlib import Path
+
+from app.models import ChangeLogResponse, ReplicationSnapshotResponse, ReplicationStatusResponse
+from app.database import get_db
+from app.config import settings
+from app.services.cold_storage import get_cold_storage, open_from_archive
+from app.services.replication import get_replica
+from app.utils.file_validation import validate_filename, ValidationError
+
+
+router = APIRouter(prefix="/api/replication", tags=["replication"])
+
+# Bytes read from an archive member per streamed chunk
+ARCHIVE_CHUNK_SIZE = 1024 * 1024
+
+
+@router.get("/changes", response_model=ChangeLogResponse)
+async def get_changes(after: int = 0, limit: int = Query(default=500, ge=1, le=5000)):
+    """Get ordered change log entries after a sequence number."""
+    db = get_db()
+    bounds = await db.get_change_log_bounds()
+    changes = await db.get_changes(after, limit)
+    return ChangeLogResponse(changes=changes, **bounds)
+
+
+@router.get("/snapshot", response_model=ReplicationSnapshotResponse)
+async def get_snapshot():
+    """Get all replicated project and file metadata for a full resynchronization."""
+    return ReplicationSnapshotResponse(**await get_db().get_replication_snapshot())
+
+
+def _iter_stream(stream: IO[bytes]) -> Iterator[bytes]:
+    """Read a stream to the end in chunks and close it; iterated in a worker thread."""
+    with stream:
+        while chunk := stream.read(ARCHIVE_CHUNK_SIZE):
+            yield chunk
+
+
+@router.get("/files/{project_id}/{filepath:path}")
+async def get_file(project_id: str, filepath: str):
+    """Serve a project file to a replica without recording access or rehydrating it."""
+    project = await get_db().get_project_by_id(project_id)
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Project '{project_id}' not found"
+        )
+
+    try:
+        filename = validate_filename(filepath)
+    except ValidationError:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied"
+        )
+
+    project_dir = (Path(settings.projects_dir) / project["id"]).resolve()
+    file_path = (project_dir / filename).resolve()
+    if not file_path.is_relative_to(project_dir):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied"
+        )
+
+    if file_path.is_file():
+        return FileResponse(path=file_path, media_type="application/octet-stream")
+
+    # Archived members are streamed in chunks read off the event loop
+    archive_path = get_cold_storage().archive_path(project["id"])
+    member = await asyncio.to_thread(open_from_archive, archive_path, filename)
+    if member is not None:
+        stream, size = member
+        return StreamingResponse(
+            _iter_stream(stream),
+            media_type="application/octet-stream",
+            headers={"Content-Length": str(size)}
+        )
+
+    raise HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=f"File '{filepath}' not found"
+    )
+
+
+@router.get("/status", response_model=ReplicationStatusResponse)
+async def replication_status():
+    """Get this node's replication role, progress and lag."""
+    replica = get_replica()
+    if replica is not None:
+        return ReplicationStatusResponse(**replica.status())
+
+    bounds = await get_db().get_change_log_bounds()
+    return ReplicationStatusResponse(role="primary", primary_last_seq=bounds["last_seq"])
@@ -7,13 +7,36 @@ import mimetypes
 
 from app.database import get_db
 from app.config import settings
+from app.services.cold_storage import get_cold_storage, ArchiveMissingError
+from app.utils.timing import current_timings
 
 
 router = APIRouter(prefix="/view", tags=["static"])
 
 
 async def resolve_project(id_or_name: str):
-    """Resolve project by ID or name."""
+    """Resolve project by ID or name, rehydrating it from cold storage if needed."""
+    project = await _lookup_project(id_or_name)
+    if project:
+        timings = current_timings()
+        if timings is not None:
+            timings.project_id = project['id']
+            timings.cache = "miss" if project.get('archived') else "hit"
+
+        cold_storage = get_cold_storage()
+        cold_storage.tracker.touch(project['id'])
+        try:
+            await cold_storage.ensure_hydrated(project)
+        except ArchiveMissingError as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=str(e)
+            )
+    return project
+
+
+async def _lookup_project(id_or_name: str):
+    """Look up a project row by ID or name."""
     db = get_db()
 
     # Try as ID first (6 character string)
@@ -1,5 +1,6 @@
 """Application configuration management."""
 
+from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -10,6 +11,64 @@ class Settings(BaseSettings):
     host: str = "0.0.0.0"
     data_dir: str = "./data"
 
+    # Replica mode: URL (or local data directory) of the primary to follow; empty runs as primary
+    replica_of: str = ""
+    replica_poll_interval: float = 2.0
+    replica_batch_size: int = Field(500, ge=1, le=5000)  # Changes per request; the primary serves at most 5000
+
+    # Default per-project storage quota in bytes (0 for unlimited); projects may override it
+    project_quota_bytes: int = 0
+
+    # Cold storage: projects idle for this many days are compressed (0 disables)
+    archive_idle_days: float = 7.0
+    archive_check_interval: float = 3600.0
+    access_flush_interval: float = 30.0
+
+    # Background disk-vs-database reconciler
+    reconcile_enabled: bool = True
+    reconcile_repair: bool = True
+    reconcile_batch_size: int = 20
+    reconcile_interval: float = 1.0
+    reconcile_pass_interval: float = 3600.0
+    reconcile_grace_seconds: float = 300.0
+
+    # Backups: snapshots kept, and seconds between scheduled snapshots (0 disables)
+    backup_keep: int = 7
+    backup_interval: float = 0.0
+
+    # Background job queue for post-upload processing
+    job_workers: int = 2
+    job_max_attempts: int = 3
+    job_retry_delay: float = 5.0  # Seconds before the first retry; doubles per attempt
+    job_poll_interval: float = 1.0
+    job_keep: int = 1000  # Finished jobs kept for status queries
+
+    # Admission control: concurrent uploads/API calls, bounded queues, fast 503 rejection
+    upload_concurrency: int = 2
+    upload_queue_size: int = 8
+    upload_queue_timeout: float = 10.0
+    management_concurrency: int = 16
+    management_queue_size: int = 64
+    management_queue_timeout: float = 5.0
+    upload_rate_limit: int = 0  # Bytes per second per client (0 disables)
+    retry_after: int = 5
+
+    # Admin token gating privileged features such as on-demand profiling (empty disables)
+    admin_token: str = ""
+
+    # Profiling: 1-in-N sampling of /view and /api/projects (0 disables)
+    profile_sample_rate: int = 0
+    profile_keep_slowest: int = 20
+    profile_interval: float = 0.001
+
+    # Structured JSON access log
+    access_log_enabled: bool = True
+    access_log_view_sample_rate: float = 1.0  # Fraction of successful /view requests logged
+    access_log_flush_interval: float = 1.0
+    access_log_batch_size: int = 256
+    access_log_max_bytes: int = 10 * 1024 * 1024
+    access_log_backups: int = 5
+
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
 
     @property
@@ -22,6 +81,31 @@ class Settings(BaseSettings):
         """Get the projects storage directory."""
         return f"{self.data_dir}/projects"
 
+    @property
+    def backups_dir(self) -> str:
+        """Get the snapshot backup directory."""
+        return f"{self.data_dir}/backups"
+
+    @property
+    def access_log_path(self) -> str:
+        """Get the structured access log file path."""
+        return f"{self.data_dir}/logs/access.log"
+
+    @property
+    def profiles_dir(self) -> str:
+        """Get the request profile output directory."""
+        return f"{self.data_dir}/profiles"
+
+    @property
+    def ui_dir(self) -> str:
+        """Get the directory the web UI build is served from."""
+        return f"{self.data_dir}/ui"
+
+    @property
+    def archive_dir(self) -> str:
+        """Get the cold storage archive directory."""
+        return f"{self.data_dir}/archive"
+
 
 # Global settings instance
 settings = Settings()
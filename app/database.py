@@ -1,11 +1,18 @@
 """Database layer with SQLite schema and CRUD operations."""
 
 import aiosqlite
+import json
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, AsyncIterator
 import os
 
+from app.utils.timing import db_timed
+
+
+# Number of change log entries kept for replicas
+CHANGE_LOG_RETENTION = 100000
+
 
 class Database:
     """Async SQLite database manager."""
@@ -20,6 +27,10 @@ class Database:
             os.makedirs(Path(self.db_path).parent, exist_ok=True)
             self._conn = await aiosqlite.connect(self.db_path)
             self._conn.row_factory = aiosqlite.Row
+            # Required for ON DELETE CASCADE (and the accounting triggers it fires)
+            await self._conn.execute("PRAGMA foreign_keys = ON")
+            # WAL lets online backups and other readers run without blocking writes
+            await self._conn.execute("PRAGMA journal_mode = WAL")
         return self._conn
 
     async def close(self):
@@ -38,10 +49,24 @@ class Database:
                 name TEXT UNIQUE NOT NULL,
                 created_at TEXT NOT NULL,
                 updated_at TEXT NOT NULL,
-                entry_file TEXT DEFAULT 'index.html'
+                entry_file TEXT DEFAULT 'index.html',
+                last_accessed_at TEXT,
+                archived INTEGER NOT NULL DEFAULT 0,
+                file_count INTEGER NOT NULL DEFAULT 0,
+                total_bytes INTEGER NOT NULL DEFAULT 0,
+                last_upload_at TEXT,
+                quota_bytes INTEGER
             )
         """)
 
+        # Columns added after the initial schema; older databases need them too
+        await self._add_column_if_missing(conn, "projects", "last_accessed_at", "TEXT")
+        await self._add_column_if_missing(conn, "projects", "archived", "INTEGER NOT NULL DEFAULT 0")
+        await self._add_column_if_missing(conn, "projects", "file_count", "INTEGER NOT NULL DEFAULT 0")
+        await self._add_column_if_missing(conn, "projects", "total_bytes", "INTEGER NOT NULL DEFAULT 0")
+        await self._add_column_if_missing(conn, "projects", "last_upload_at", "TEXT")
+        await self._add_column_if_missing(conn, "projects", "quota_bytes", "INTEGER")
+
         await conn.execute("""
             CREATE TABLE IF NOT EXISTS files (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -49,19 +74,248 @@ class Database:
                 filename TEXT NOT NULL,
                 size INTEGER NOT NULL,
                 uploaded_at TEXT NOT NULL,
+                sha256 TEXT,
                 FOREIGN KEY (project_id) REFERENCES projects(id) ON DELETE CASCADE,
                 UNIQUE(project_id, filename)
             )
         """)
 
+        await self._add_column_if_missing(conn, "files", "sha256", "TEXT")
+
         # Create indexes
         await conn.execute("CREATE INDEX IF NOT EXISTS idx_projects_name ON projects(name)")
         await conn.execute("CREATE INDEX IF NOT EXISTS idx_files_project ON files(project_id)")
 
+        await self._init_storage_accounting(conn)
+        await self._init_change_log(conn)
+
+        # Background reconciler progress and findings
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS reconciler_state (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            )
+        """)
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS reconciler_findings (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                project_id TEXT NOT NULL,
+                filename TEXT,
+                detail TEXT,
+                repaired INTEGER NOT NULL DEFAULT 0,
+                found_at TEXT NOT NULL
+            )
+        """)
+
+        # Source directories imported by the `framebox import` command, for resuming
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS import_sources (
+                source TEXT PRIMARY KEY,
+                project_id TEXT NOT NULL,
+                started_at TEXT NOT NULL,
+                completed_at TEXT
+            )
+        """)
+
+        # Background job queue; at most one pending job per kind and project
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                project_id TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL,
+                run_after TEXT NOT NULL,
+                last_error TEXT,
+                result TEXT,
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL,
+                started_at TEXT,
+                finished_at TEXT,
+                coalesced_into INTEGER
+            )
+        """)
+        await self._add_column_if_missing(conn, "jobs", "coalesced_into", "INTEGER")
+        await conn.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_pending ON jobs(kind, project_id) "
+            "WHERE status = 'pending'"
+        )
+        await conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, run_after)")
+
         await conn.commit()
 
+    async def _init_storage_accounting(self, conn: aiosqlite.Connection):
+        """Create the instance-wide stats row and the triggers keeping usage aggregates current."""
+        cursor = await conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'storage_stats'"
+        )
+        is_new = await cursor.fetchone() is None
+
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS storage_stats (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                project_count INTEGER NOT NULL DEFAULT 0,
+                file_count INTEGER NOT NULL DEFAULT 0,
+                total_bytes INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+
+        await conn.executescript("""
+            CREATE TRIGGER IF NOT EXISTS trg_projects_insert AFTER INSERT ON projects
+            BEGIN
+                UPDATE storage_stats SET project_count = project_count + 1 WHERE id = 1;
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_projects_delete AFTER DELETE ON projects
+            BEGIN
+                UPDATE storage_stats SET project_count = project_count - 1 WHERE id = 1;
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_files_insert AFTER INSERT ON files
+            BEGIN
+                UPDATE projects SET
+                    file_count = file_count + 1,
+                    total_bytes = total_bytes + NEW.size,
+                    last_upload_at = NEW.uploaded_at
+                WHERE id = NEW.project_id;
+                UPDATE storage_stats SET
+                    file_count = file_count + 1,
+                    total_bytes = total_bytes + NEW.size
+                WHERE id = 1;
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_files_update AFTER UPDATE OF size, uploaded_at ON files
+            BEGIN
+                UPDATE projects SET
+                    total_bytes = total_bytes - OLD.size + NEW.size,
+                    last_upload_at = NEW.uploaded_at
+                WHERE id = NEW.project_id;
+                UPDATE storage_stats SET total_bytes = total_bytes - OLD.size + NEW.size WHERE id = 1;
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_files_delete AFTER DELETE ON files
+            BEGIN
+                UPDATE projects SET
+                    file_count = file_count - 1,
+                    total_bytes = total_bytes - OLD.size
+                WHERE id = OLD.project_id;
+                UPDATE storage_stats SET
+                    file_count = file_count - 1,
+                    total_bytes = total_bytes - OLD.size
+                WHERE id = 1;
+            END;
+        """)
+
+        if is_new:
+            await self._backfill_storage_accounting(conn)
+
+    async def _init_change_log(self, conn: aiosqlite.Connection):
+        """Create the ordered change log that replicas follow, maintained by triggers."""
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS changes (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                project_id TEXT NOT NULL,
+                filename TEXT,
+                payload TEXT,
+                created_at TEXT NOT NULL
+            )
+        """)
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS replica_state (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            )
+        """)
+
+        # Only replicated columns are logged; access times, archival and usage
+        # aggregates are maintained locally on every node.
+        project_payload = (
+            "json_object('name', NEW.name, 'created_at', NEW.created_at, "
+            "'updated_at', NEW.updated_at, 'entry_file', NEW.entry_file, "
+            "'quota_bytes', NEW.quota_bytes)"
+        )
+        file_payload = "json_object('size', NEW.size, 'uploaded_at', NEW.uploaded_at)"
+        now = "strftime('%Y-%m-%dT%H:%M:%f', 'now')"
+
+        await conn.executescript(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_changes_project_insert AFTER INSERT ON projects
+            BEGIN
+                INSERT INTO changes (kind, project_id, payload, created_at)
+                VALUES ('project_upsert', NEW.id, {project_payload}, {now});
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_changes_project_update
+            AFTER UPDATE OF name, created_at, updated_at, entry_file, quota_bytes ON projects
+            BEGIN
+                INSERT INTO changes (kind, project_id, payload, created_at)
+                VALUES ('project_upsert', NEW.id, {project_payload}, {now});
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_changes_project_delete AFTER DELETE ON projects
+            BEGIN
+                INSERT INTO changes (kind, project_id, created_at)
+                VALUES ('project_delete', OLD.id, {now});
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_changes_file_insert AFTER INSERT ON files
+            BEGIN
+                INSERT INTO changes (kind, project_id, filename, payload, created_at)
+                VALUES ('file_upsert', NEW.project_id, NEW.filename, {file_payload}, {now});
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_changes_file_update AFTER UPDATE OF size, uploaded_at ON files
+            BEGIN
+                INSERT INTO changes (kind, project_id, filename, payload, created_at)
+                VALUES ('file_upsert', NEW.project_id, NEW.filename, {file_payload}, {now});
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_changes_file_delete AFTER DELETE ON files
+            BEGIN
+                INSERT INTO changes (kind, project_id, filename, created_at)
+                VALUES ('file_delete', OLD.project_id, OLD.filename, {now});
+            END;
+
+            -- Bound the log; replicas further behind than this resynchronize from a snapshot
+            CREATE TRIGGER IF NOT EXISTS trg_changes_prune AFTER INSERT ON changes
+            WHEN NEW.seq % 1000 = 0
+            BEGIN
+                DELETE FROM changes WHERE seq <= NEW.seq - {CHANGE_LOG_RETENTION};
+            END;
+        """)
+
+    async def _backfill_storage_accounting(self, conn: aiosqlite.Connection):
+        """Compute usage aggregates once for data written before the triggers existed."""
+        # Foreign keys were not enforced before, so deleted projects may have left file rows behind
+        await conn.execute("DELETE FROM files WHERE project_id NOT IN (SELECT id FROM projects)")
+
+        await conn.execute("""
+            UPDATE projects SET
+                file_count = (SELECT COUNT(*) FROM files WHERE files.project_id = projects.id),
+                total_bytes = (SELECT COALESCE(SUM(size), 0) FROM files WHERE files.project_id = projects.id),
+                last_upload_at = (SELECT MAX(uploaded_at) FROM files WHERE files.project_id = projects.id)
+        """)
+        await conn.execute("""
+            INSERT OR REPLACE INTO storage_stats (id, project_count, file_count, total_bytes)
+            SELECT 1,
+                   (SELECT COUNT(*) FROM projects),
+                   (SELECT COUNT(*) FROM files),
+                   (SELECT COALESCE(SUM(size), 0) FROM files)
+        """)
+
+    async def _add_column_if_missing(self, conn: aiosqlite.Connection, table: str,
+                                     column: str, definition: str):
+        """Add a column to an existing table unless it is already present."""
+        cursor = await conn.execute(f"PRAGMA table_info({table})")
+        columns = {row["name"] for row in await cursor.fetchall()}
+        if column not in columns:
+            await conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
     # Project CRUD operations
 
+    @db_timed
     async def create_project(self, project_id: str, name: str, entry_file: str = "index.html") -> Dict[str, Any]:
         """Create a new project."""
         conn = await self.connect()
@@ -78,9 +332,16 @@ class Database:
             "name": name,
             "created_at": now,
             "updated_at": now,
-            "entry_file": entry_file
+            "entry_file": entry_file,
+            "last_accessed_at": None,
+            "archived": 0,
+            "file_count": 0,
+            "total_bytes": 0,
+            "last_upload_at": None,
+            "quota_bytes": None
         }
 
+    @db_timed
     async def get_project_by_id(self, project_id: str) -> Optional[Dict[str, Any]]:
         """Get project by ID."""
         conn = await self.connect()
@@ -91,6 +352,7 @@ class Database:
         row = await cursor.fetchone()
         return dict(row) if row else None
 
+    @db_timed
     async def get_project_by_name(self, name: str) -> Optional[Dict[str, Any]]:
         """Get project by name."""
         conn = await self.connect()
@@ -101,6 +363,7 @@ class Database:
         row = await cursor.fetchone()
         return dict(row) if row else None
 
+    @db_timed
     async def list_projects(self, search: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """List all projects with optional search and limit."""
         conn = await self.connect()
@@ -122,9 +385,36 @@ class Database:
         rows = await cursor.fetchall()
         return [dict(row) for row in rows]
 
+    async def iter_export(self, chunk_size: int = 1000) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Yield every project and then every file row, in chunks of at most `chunk_size`.
+
+        Rows are read from a consistent snapshot on a separate connection, so a
+        long export neither holds the shared connection nor sees partial writes.
+        Each row carries a "type" key ("project" or "file").
+        """
+        conn = await aiosqlite.connect(self.db_path)
+        conn.row_factory = aiosqlite.Row
+        try:
+            await conn.execute("BEGIN")
+            queries = (
+                ("project", "SELECT * FROM projects ORDER BY id"),
+                ("file", "SELECT project_id, filename, size, uploaded_at, sha256 FROM files "
+                         "ORDER BY project_id, filename"),
+            )
+            for row_type, query in queries:
+                cursor = await conn.execute(query)
+                while rows := await cursor.fetchmany(chunk_size):
+                    yield [{"type": row_type, **dict(row)} for row in rows]
+                await cursor.close()
+        finally:
+            await conn.close()
+
+    @db_timed
     async def update_project(self, project_id: str, name: Optional[str] = None,
-                           entry_file: Optional[str] = None) -> bool:
-        """Update project metadata."""
+                           entry_file: Optional[str] = None, quota_bytes: Optional[int] = None,
+                           clear_quota: bool = False) -> bool:
+        """Update project metadata; `clear_quota` resets the quota to the instance default."""
         conn = await self.connect()
         now = datetime.utcnow().isoformat()
 
@@ -139,6 +429,12 @@ class Database:
             updates.append("entry_file = ?")
             params.append(entry_file)
 
+        if clear_quota:
+            updates.append("quota_bytes = NULL")
+        elif quota_bytes is not None:
+            updates.append("quota_bytes = ?")
+            params.append(quota_bytes)
+
         if not updates:
             return False
 
@@ -152,6 +448,7 @@ class Database:
 
         return True
 
+    @db_timed
     async def delete_project(self, project_id: str) -> bool:
         """Delete a project (files cascade automatically)."""
         conn = await self.connect()
@@ -159,8 +456,59 @@ class Database:
         await conn.commit()
         return cursor.rowcount > 0
 
+    @db_timed
+    async def get_storage_stats(self) -> Dict[str, Any]:
+        """Get instance-wide usage totals maintained by triggers."""
+        conn = await self.connect()
+        cursor = await conn.execute(
+            "SELECT project_count, file_count, total_bytes FROM storage_stats WHERE id = 1"
+        )
+        row = await cursor.fetchone()
+        return dict(row) if row else {"project_count": 0, "file_count": 0, "total_bytes": 0}
+
+    # Access tracking and archival
+
+    @db_timed
+    async def record_accesses(self, accesses: Dict[str, str]) -> None:
+        """Persist a batch of last-access timestamps keyed by project ID."""
+        if not accesses:
+            return
+
+        conn = await self.connect()
+        await conn.executemany(
+            "UPDATE projects SET last_accessed_at = ? WHERE id = ?",
+            [(accessed_at, project_id) for project_id, accessed_at in accesses.items()]
+        )
+        await conn.commit()
+
+    @db_timed
+    async def list_idle_projects(self, cutoff: str) -> List[str]:
+        """List IDs of unarchived projects not accessed or updated since cutoff."""
+        conn = await self.connect()
+        cursor = await conn.execute(
+            """
+            SELECT id FROM projects
+            WHERE archived = 0 AND COALESCE(last_accessed_at, updated_at) < ?
+            ORDER BY COALESCE(last_accessed_at, updated_at)
+            """,
+            (cutoff,)
+        )
+        rows = await cursor.fetchall()
+        return [row["id"] for row in rows]
+
+    @db_timed
+    async def set_project_archived(self, project_id: str, archived: bool) -> None:
+        """Mark a project as archived (compressed) or hydrated (expanded on disk)."""
+        conn = await self.connect()
+        await conn.execute(
+            "UPDATE projects SET archived = ? WHERE id = ?",
+            (1 if archived else 0, project_id)
+        )
+        await conn.commit()
+
     # File CRUD operations
 
+    @db_timed
     async def add_file(self, project_id: str, filename: str, size: int) -> Dict[str, Any]:
         """Add or update file metadata."""
         conn = await self.connect()
@@ -171,7 +519,7 @@ class Database:
             INSERT INTO files (project_id, filename, size, uploaded_at)
             VALUES (?, ?, ?, ?)
             ON CONFLICT(project_id, filename)
-            DO UPDATE SET size = excluded.size, uploaded_at = excluded.uploaded_at
+            DO UPDATE SET size = excluded.size, uploaded_at = excluded.uploaded_at, sha256 = NULL
         """, (project_id, filename, size, now))
         await conn.commit()
 
@@ -182,16 +530,69 @@ class Database:
             "uploaded_at": now
         }
 
+    @db_timed
     async def list_files(self, project_id: str) -> List[Dict[str, Any]]:
         """List all files for a project."""
         conn = await self.connect()
         cursor = await conn.execute(
-            "SELECT filename, size, uploaded_at FROM files WHERE project_id = ? ORDER BY filename",
+            "SELECT filename, size, uploaded_at, sha256 FROM files WHERE project_id = ? ORDER BY filename",
             (project_id,)
         )
         rows = await cursor.fetchall()
         return [dict(row) for row in rows]
 
+    @db_timed
+    async def get_file_sizes(self, project_id: str, filenames: List[str]) -> Dict[str, int]:
+        """Get current sizes of the given files in a project (missing files are omitted)."""
+        if not filenames:
+            return {}
+
+        conn = await self.connect()
+        placeholders = ", ".join("?" * len(filenames))
+        cursor = await conn.execute(
+            f"SELECT filename, size FROM files WHERE project_id = ? AND filename IN ({placeholders})",
+            (project_id, *filenames)
+        )
+        rows = await cursor.fetchall()
+        return {row["filename"]: row["size"] for row in rows}
+
+    @db_timed
+    async def list_unhashed_files(self, project_id: str) -> List[Dict[str, Any]]:
+        """List files of a project that have no content digest yet."""
+        conn = await self.connect()
+        cursor = await conn.execute(
+            """
+            SELECT filename, size, uploaded_at FROM files
+            WHERE project_id = ? AND sha256 IS NULL ORDER BY filename
+            """,
+            (project_id,)
+        )
+        rows = await cursor.fetchall()
+        return [dict(row) for row in rows]
+
+    @db_timed
+    async def set_file_digest(self, project_id: str, filename: str, uploaded_at: str, sha256: str) -> bool:
+        """Record a file's digest unless the file was replaced since `uploaded_at`."""
+        conn = await self.connect()
+        cursor = await conn.execute(
+            "UPDATE files SET sha256 = ? WHERE project_id = ? AND filename = ? AND uploaded_at = ?",
+            (sha256, project_id, filename, uploaded_at)
+        )
+        await conn.commit()
+        return cursor.rowcount > 0
+
+    @db_timed
+    async def update_file_size(self, project_id: str, filename: str, size: int) -> bool:
+        """Correct the recorded size of a file without changing its upload time."""
+        conn = await self.connect()
+        cursor = await conn.execute(
+            "UPDATE files SET size = ? WHERE project_id = ? AND filename = ?",
+            (size, project_id, filename)
+        )
+        await conn.commit()
+        return cursor.rowcount > 0
+
+    @db_timed
     async def delete_file(self, project_id: str, filename: str) -> bool:
         """Delete a file record."""
         conn = await self.connect()
@@ -202,6 +603,380 @@ class Database:
         await conn.commit()
         return cursor.rowcount > 0
 
+    # Reconciler state
+
+    @db_timed
+    async def list_projects_after(self, after: str, limit: int) -> List[Dict[str, Any]]:
+        """List projects ordered by ID, starting after the given ID."""
+        conn = await self.connect()
+        cursor = await conn.execute(
+            "SELECT id, archived FROM projects WHERE id > ? ORDER BY id LIMIT ?",
+            (after, limit)
+        )
+        rows = await cursor.fetchall()
+        return [dict(row) for row in rows]
+
+    @db_timed
+    async def get_existing_project_ids(self, project_ids: List[str]) -> set:
+        """Return the subset of the given IDs that belong to existing projects."""
+        if not project_ids:
+            return set()
+
+        conn = await self.connect()
+        placeholders = ", ".join("?" * len(project_ids))
+        cursor = await conn.execute(
+            f"SELECT id FROM projects WHERE id IN ({placeholders})",
+            project_ids
+        )
+        rows = await cursor.fetchall()
+        return {row["id"] for row in rows}
+
+    @db_timed
+    async def get_reconciler_state(self) -> Dict[str, str]:
+        """Get the persisted reconciler progress."""
+        conn = await self.connect()
+        cursor = await conn.execute("SELECT key, value FROM reconciler_state")
+        rows = await cursor.fetchall()
+        return {row["key"]: row["value"] for row in rows}
+
+    @db_timed
+    async def save_reconciler_state(self, state: Dict[str, str]) -> None:
+        """Persist reconciler progress."""
+        conn = await self.connect()
+        await conn.executemany(
+            "INSERT OR REPLACE INTO reconciler_state (key, value) VALUES (?, ?)",
+            list(state.items())
+        )
+        await conn.commit()
+
+    @db_timed
+    async def add_reconciler_finding(self, kind: str, project_id: str, filename: Optional[str],
+                                     detail: str, repaired: bool, keep: int = 1000) -> None:
+        """Record a drift finding, keeping only the most recent ones."""
+        conn = await self.connect()
+        now = datetime.utcnow().isoformat()
+        await conn.execute(
+            """
+            INSERT INTO reconciler_findings (kind, project_id, filename, detail, repaired, found_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (kind, project_id, filename, detail, 1 if repaired else 0, now)
+        )
+        await conn.execute(
+            "DELETE FROM reconciler_findings WHERE id <= (SELECT MAX(id) FROM reconciler_findings) - ?",
+            (keep,)
+        )
+        await conn.commit()
+
+    @db_timed
+    async def list_reconciler_findings(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """List the most recent drift findings."""
+        conn = await self.connect()
+        cursor = await conn.execute(
+            """
+            SELECT kind, project_id, filename, detail, repaired, found_at
+            FROM reconciler_findings ORDER BY id DESC LIMIT ?
+            """,
+            (limit,)
+        )
+        rows = await cursor.fetchall()
+        return [dict(row) for row in rows]
+
+    # Replication
+
+    @db_timed
+    async def get_change_log_bounds(self) -> Dict[str, int]:
+        """Get the oldest retained and the latest change sequence numbers."""
+        return await self._change_log_bounds(await self.connect())
+
+    @staticmethod
+    async def _change_log_bounds(conn: aiosqlite.Connection) -> Dict[str, int]:
+        cursor = await conn.execute("SELECT MIN(seq) AS oldest_seq, MAX(seq) AS last_seq FROM changes")
+        row = await cursor.fetchone()
+        if row["last_seq"] is None:
+            # Empty log: continue from the AUTOINCREMENT high-water mark
+            cursor = await conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'changes'")
+            high_water = await cursor.fetchone()
+            last_seq = high_water["seq"] if high_water else 0
+            return {"oldest_seq": last_seq + 1, "last_seq": last_seq}
+        return {"oldest_seq": row["oldest_seq"], "last_seq": row["last_seq"]}
+
+    @db_timed
+    async def get_changes(self, after: int, limit: int) -> List[Dict[str, Any]]:
+        """Get change log entries with a sequence number greater than `after`, in order."""
+        conn = await self.connect()
+        cursor = await conn.execute(
+            """
+            SELECT seq, kind, project_id, filename, payload, created_at
+            FROM changes WHERE seq > ? ORDER BY seq LIMIT ?
+            """,
+            (after, limit)
+        )
+        rows = await cursor.fetchall()
+        changes = []
+        for row in rows:
+            change = dict(row)
+            change["payload"] = json.loads(change["payload"]) if change["payload"] else None
+            changes.append(change)
+        return changes
+
+    @db_timed
+    async def get_replication_snapshot(self) -> Dict[str, Any]:
+        """Get all replicated metadata, with the change sequence it is current as of."""
+        # One read transaction on a separate connection, so the rows match the sequence exactly
+        conn = await aiosqlite.connect(self.db_path)
+        conn.row_factory = aiosqlite.Row
+        try:
+            await conn.execute("BEGIN")
+            bounds = await self._change_log_bounds(conn)
+            cursor = await conn.execute(
+                "SELECT id, name, created_at, updated_at, entry_file, quota_bytes FROM projects ORDER BY id"
+            )
+            projects = [dict(row) for row in await cursor.fetchall()]
+            cursor = await conn.execute(
+                "SELECT project_id, filename, size, uploaded_at FROM files ORDER BY project_id, filename"
+            )
+            files = [dict(row) for row in await cursor.fetchall()]
+        finally:
+            await conn.close()
+        return {"last_seq": bounds["last_seq"], "projects": projects, "files": files}
+
+    @db_timed
+    async def upsert_replicated_project(self, project: Dict[str, Any]) -> None:
+        """Insert or update a project row received from a primary."""
+        conn = await self.connect()
+        # A replayed rename may target a name another project took later in the log; park
+        # that project on a unique placeholder until its own rename is applied
+        await conn.execute(
+            "UPDATE projects SET name = '~' || id WHERE name = ? AND id != ?",
+            (project["name"], project["id"])
+        )
+        await conn.execute(
+            """
+            INSERT INTO projects (id, name, created_at, updated_at, entry_file, quota_bytes)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(id) DO UPDATE SET
+                name = excluded.name,
+                created_at = excluded.created_at,
+                updated_at = excluded.updated_at,
+                entry_file = excluded.entry_file,
+                quota_bytes = excluded.quota_bytes
+            """,
+            (project["id"], project["name"], project["created_at"], project["updated_at"],
+             project["entry_file"], project.get("quota_bytes"))
+        )
+        await conn.commit()
+
+    @db_timed
+    async def upsert_replicated_file(self, project_id: str, filename: str, size: int,
+                                     uploaded_at: str) -> None:
+        """Insert or update a file row received from a primary, keeping its upload time."""
+        conn = await self.connect()
+        await conn.execute(
+            """
+            INSERT INTO files (project_id, filename, size, uploaded_at)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(project_id, filename)
+            DO UPDATE SET size = excluded.size, uploaded_at = excluded.uploaded_at, sha256 = NULL
+            """,
+            (project_id, filename, size, uploaded_at)
+        )
+        await conn.commit()
+
+    @db_timed
+    async def list_all_files(self) -> List[Dict[str, Any]]:
+        """List file rows of every project."""
+        conn = await self.connect()
+        cursor = await conn.execute("SELECT project_id, filename, size, uploaded_at FROM files")
+        rows = await cursor.fetchall()
+        return [dict(row) for row in rows]
+
+    @db_timed
+    async def get_replica_state(self) -> Dict[str, str]:
+        """Get the persisted replica progress."""
+        conn = await self.connect()
+        cursor = await conn.execute("SELECT key, value FROM replica_state")
+        rows = await cursor.fetchall()
+        return {row["key"]: row["value"] for row in rows}
+
+    @db_timed
+    async def save_replica_state(self, state: Dict[str, str]) -> None:
+        """Persist replica progress."""
+        conn = await self.connect()
+        await conn.executemany(
+            "INSERT OR REPLACE INTO replica_state (key, value) VALUES (?, ?)",
+            list(state.items())
+        )
+        await conn.commit()
+
+    # Job queue
+
+    @db_timed
+    async def enqueue_job(self, kind: str, project_id: str, max_attempts: int) -> Dict[str, Any]:
+        """Queue a job, or return the pending job of the same kind for the project."""
+        conn = await self.connect()
+        now = datetime.utcnow().isoformat()
+        # A job that is waiting out a retry delay becomes due again right away
+        cursor = await conn.execute(
+            """
+            INSERT INTO jobs (kind, project_id, max_attempts, run_after, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(kind, project_id) WHERE status = 'pending'
+            DO UPDATE SET run_after = excluded.run_after, updated_at = excluded.updated_at
+            RETURNING id
+            """,
+            (kind, project_id, max_attempts, now, now, now)
+        )
+        row = await cursor.fetchone()
+        await conn.commit()
+        return await self.get_job(row["id"])
+
+    @db_timed
+    async def get_job(self, job_id: int) -> Optional[Dict[str, Any]]:
+        """Get a job by ID, or the job that took over its work if it was coalesced."""
+        conn = await self.connect()
+        cursor = await conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,))
+        row = await cursor.fetchone()
+        if not row:
+            return None
+        # The surviving job may itself have been coalesced later; it is kept unless pruned
+        while row["status"] == "coalesced" and row["coalesced_into"] is not None:
+            cursor = await conn.execute("SELECT * FROM jobs WHERE id = ?", (row["coalesced_into"],))
+            survivor = await cursor.fetchone()
+            if not survivor:
+                break
+            row = survivor
+        job = dict(row)
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    @db_timed
+    async def claim_job(self) -> Optional[Dict[str, Any]]:
+        """Mark the next due job as running and return it."""
+        conn = await self.connect()
+        now = datetime.utcnow().isoformat()
+        # Jobs of a project whose previous job of the same kind is still running wait for it
+        cursor = await conn.execute(
+            """
+            UPDATE jobs SET status = 'running', attempts = attempts + 1,
+                started_at = ?, updated_at = ?
+            WHERE id = (
+                SELECT p.id FROM jobs p
+                WHERE p.status = 'pending' AND p.run_after <= ?
+                AND NOT EXISTS (
+                    SELECT 1 FROM jobs r
+                    WHERE r.status = 'running' AND r.kind = p.kind AND r.project_id = p.project_id
+                )
+                ORDER BY p.run_after, p.id LIMIT 1
+            )
+            RETURNING id, kind, project_id, attempts, max_attempts
+            """,
+            (now, now, now)
+        )
+        row = await cursor.fetchone()
+        await conn.commit()
+        return dict(row) if row else None
+
+    @db_timed
+    async def complete_job(self, job_id: int, result: Dict[str, Any]) -> None:
+        """Mark a running job as succeeded."""
+        conn = await self.connect()
+        now = datetime.utcnow().isoformat()
+        await conn.execute(
+            """
+            UPDATE jobs SET status = 'succeeded', result = ?, last_error = NULL,
+                finished_at = ?, updated_at = ?
+            WHERE id = ?
+            """,
+            (json.dumps(result), now, now, job_id)
+        )
+        await conn.commit()
+
+    @db_timed
+    async def fail_job(self, job_id: int, error: str, retry_at: Optional[str] = None) -> None:
+        """
+        Record a failed attempt, scheduling a retry at `retry_at` or failing the job for good.
+
+        A job to retry is coalesced into a newer pending job of the same kind
+        and project when there is one, since that job covers the same work;
+        `coalesced_into` records which job that is.
+        """
+        conn = await self.connect()
+        now = datetime.utcnow().isoformat()
+        if retry_at is None:
+            await conn.execute(
+                """
+                UPDATE jobs SET status = 'failed', last_error = ?, finished_at = ?, updated_at = ?
+                WHERE id = ?
+                """,
+                (error, now, now, job_id)
+            )
+        else:
+            await conn.execute(
+                """
+                UPDATE jobs SET
+                    status = CASE WHEN EXISTS (
+                        SELECT 1 FROM jobs p
+                        WHERE p.status = 'pending' AND p.kind = jobs.kind AND p.project_id = jobs.project_id
+                    ) THEN 'coalesced' ELSE 'pending' END,
+                    coalesced_into = (
+                        SELECT p.id FROM jobs p
+                        WHERE p.status = 'pending' AND p.kind = jobs.kind AND p.project_id = jobs.project_id
+                    ),
+                    last_error = ?, run_after = ?, updated_at = ?
+                WHERE id = ?
+                """,
+                (error, retry_at, now, job_id)
+            )
+        await conn.commit()
+
+    @db_timed
+    async def requeue_running_jobs(self) -> int:
+        """Return jobs left running by a previous process to the queue."""
+        conn = await self.connect()
+        now = datetime.utcnow().isoformat()
+        cursor = await conn.execute(
+            """
+            UPDATE jobs SET
+                status = CASE WHEN EXISTS (
+                    SELECT 1 FROM jobs p
+                    WHERE p.status = 'pending' AND p.kind = jobs.kind AND p.project_id = jobs.project_id
+                ) THEN 'coalesced' ELSE 'pending' END,
+                coalesced_into = (
+                    SELECT p.id FROM jobs p
+                    WHERE p.status = 'pending' AND p.kind = jobs.kind AND p.project_id = jobs.project_id
+                ),
+                run_after = ?, updated_at = ?
+            WHERE status = 'running'
+            """,
+            (now, now)
+        )
+        await conn.commit()
+        return cursor.rowcount
+
+    @db_timed
+    async def prune_jobs(self, keep: int) -> None:
+        """Delete finished jobs beyond the most recent `keep`."""
+        conn = await self.connect()
+        await conn.execute(
+            """
+            DELETE FROM jobs WHERE status IN ('succeeded', 'failed', 'coalesced') AND id <= (
+                SELECT id FROM jobs WHERE status IN ('succeeded', 'failed', 'coalesced')
+                ORDER BY id DESC LIMIT 1 OFFSET ?
+            )
+            """,
+            (keep,)
+        )
+        await conn.commit()
+
+    @db_timed
+    async def count_jobs(self) -> Dict[str, int]:
+        """Count jobs by status."""
+        conn = await self.connect()
+        cursor = await conn.execute("SELECT status, COUNT(*) AS count FROM jobs GROUP BY status")
+        rows = await cursor.fetchall()
+        return {row["status"]: row["count"] for row in rows}
+
 
 # Global database instance
 db: Optional[Database] = None
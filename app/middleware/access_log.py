@@ -0,0 +1,170 @@
+"""Structured JSON access logging through a buffered, rotating background writer."""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.utils.timing import start_request_timings
+
+
+logger = logging.getLogger(__name__)
+
+
+class AccessLogWriter:
+    """
+    Buffers log records in memory and writes them in batches from a worker thread.
+
+    Recording never blocks the event loop: records are appended to a bounded
+    in-memory buffer, and when the buffer is full new records are dropped and
+    counted instead of applying backpressure to requests.
+    """
+
+    def __init__(self, path: str, flush_interval: float = 1.0, batch_size: int = 256,
+                 max_buffer: int = 10000, max_bytes: int = 10 * 1024 * 1024, backups: int = 5):
+        self.path = Path(path)
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_buffer = max_buffer
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.dropped = 0
+        self._buffer: List[str] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_settings(cls, settings) -> "AccessLogWriter":
+        """Build a writer from application settings."""
+        return cls(
+            settings.access_log_path,
+            flush_interval=settings.access_log_flush_interval,
+            batch_size=settings.access_log_batch_size,
+            max_bytes=settings.access_log_max_bytes,
+            backups=settings.access_log_backups,
+        )
+
+    def record(self, entry: Dict[str, Any]):
+        """Queue a log record for writing."""
+        if len(self._buffer) >= self.max_buffer:
+            self.dropped += 1
+            return
+        self._buffer.append(json.dumps(entry, separators=(",", ":")))
+        if self._wakeup is not None and len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    def start(self):
+        """Start the background flush loop."""
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flush loop and write any buffered records."""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Failed to write access log")
+
+    async def flush(self):
+        """Write all buffered records."""
+        if not self._buffer:
+            return
+        batch, self._buffer = self._buffer, []
+        await asyncio.to_thread(self._write, batch)
+
+    def _write(self, lines: List[str]):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.max_bytes > 0 and self.path.exists() and self.path.stat().st_size >= self.max_bytes:
+            self._rotate()
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+    def _rotate(self):
+        for index in range(self.backups - 1, 0, -1):
+            source = self.path.with_name(f"{self.path.name}.{index}")
+            if source.exists():
+                os.replace(source, self.path.with_name(f"{self.path.name}.{index + 1}"))
+        if self.backups > 0:
+            os.replace(self.path, self.path.with_name(f"{self.path.name}.1"))
+        else:
+            self.path.unlink()
+
+
+class AccessLogMiddleware:
+    """ASGI middleware recording one structured log line per HTTP request."""
+
+    def __init__(self, app, writer: AccessLogWriter, view_sample_rate: float = 1.0):
+        self.app = app
+        self.writer = writer
+        self.view_sample_rate = view_sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = start_request_timings()
+        started = time.perf_counter()
+        response: Dict[str, Any] = {"status": 500, "bytes": 0, "length": None, "first_byte": None}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["first_byte"] = time.perf_counter()
+                for name, value in message.get("headers", []):
+                    if name == b"content-length":
+                        response["length"] = int(value)
+            elif message["type"] == "http.response.body":
+                response["bytes"] += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self._log(scope, timings, response, started, time.perf_counter())
+
+    def _log(self, scope, timings, response: Dict[str, Any], started: float, finished: float):
+        status = response["status"]
+        path = scope["path"]
+
+        # High-volume successful embeds may be sampled; errors are always logged
+        if status < 400 and path.startswith("/view/") and random.random() >= self.view_sample_rate:
+            return
+
+        first_byte = response["first_byte"] or finished
+        route = scope.get("route")
+        project_id = timings.project_id or scope.get("path_params", {}).get("project_id")
+
+        self.writer.record({
+            "time": datetime.utcnow().isoformat(),
+            "method": scope["method"],
+            "route": getattr(route, "path", None),
+            "path": path,
+            "project_id": project_id,
+            "status": status,
+            "bytes": response["bytes"] or response["length"] or 0,
+            "total_ms": round((finished - started) * 1000, 3),
+            "db_ms": round(timings.db_time * 1000, 3),
+            "handler_ms": round(max(first_byte - started - timings.db_time, 0.0) * 1000, 3),
+            "send_ms": round((finished - first_byte) * 1000, 3),
+            "cache": timings.cache,
+            "client": scope["client"][0] if scope.get("client") else None,
+        })
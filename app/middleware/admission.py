@@ -0,0 +1,228 @@
+"""Admission control and upload bandwidth scheduling."""
+
+import asyncio
+import json
+import re
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+
+
+UPLOAD_PATH = re.compile(r"^/api/projects/[^/]+/files/?$")
+
+# Cheap endpoints that must stay responsive under load (monitoring, probes)
+UNLIMITED_PATHS = {"/api/health", "/api/metrics"}
+
+
+class AdmissionQueue:
+    """Bounded concurrency limit with a bounded FIFO wait queue."""
+
+    def __init__(self, limit: int, max_queue: int, timeout: float):
+        self.limit = limit
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.active = 0
+        self.rejected = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def queued(self) -> int:
+        """Number of requests waiting for a slot."""
+        return len(self._waiters)
+
+    async def acquire(self) -> bool:
+        """
+        Wait for a free slot.
+
+        Returns:
+            True if admitted, False if the queue is full or the wait timed out
+        """
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return True
+
+        if len(self._waiters) >= self.max_queue:
+            self.rejected += 1
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.timeout)
+            return True
+        except TimeoutError:
+            self.rejected += 1
+            return False
+        except asyncio.CancelledError:
+            # The slot may have been handed over just before cancellation
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def release(self):
+        """Free a slot, handing it directly to the oldest waiter if any."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def metrics(self) -> Dict[str, int]:
+        """Snapshot of queue state."""
+        return {
+            "active": self.active,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "limit": self.limit,
+            "max_queue": self.max_queue,
+        }
+
+
+class TokenBucket:
+    """Byte-rate limiter; consumers sleep off any deficit."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    @property
+    def idle(self) -> bool:
+        """Whether the bucket is full, i.e. the client has no outstanding debt."""
+        self._refill()
+        return self.tokens >= self.burst
+
+    async def consume(self, amount: int):
+        """Take `amount` tokens, sleeping until the balance is non-negative."""
+        self._refill()
+        self.tokens -= amount
+        if self.tokens < 0:
+            await asyncio.sleep(-self.tokens / self.rate)
+
+
+class AdmissionController:
+    """Holds the admission queues and per-client upload rate limiters."""
+
+    def __init__(self, upload_concurrency: int, upload_queue_size: int, upload_queue_timeout: float,
+                 management_concurrency: int, management_queue_size: int,
+                 management_queue_timeout: float, upload_rate_limit: int, retry_after: int):
+        self.uploads = AdmissionQueue(upload_concurrency, upload_queue_size, upload_queue_timeout)
+        self.management = AdmissionQueue(
+            management_concurrency, management_queue_size, management_queue_timeout
+        )
+        self.upload_rate_limit = upload_rate_limit
+        self.retry_after = retry_after
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    @classmethod
+    def from_settings(cls, settings) -> "AdmissionController":
+        """Build a controller from application settings."""
+        return cls(
+            upload_concurrency=settings.upload_concurrency,
+            upload_queue_size=settings.upload_queue_size,
+            upload_queue_timeout=settings.upload_queue_timeout,
+            management_concurrency=settings.management_concurrency,
+            management_queue_size=settings.management_queue_size,
+            management_queue_timeout=settings.management_queue_timeout,
+            upload_rate_limit=settings.upload_rate_limit,
+            retry_after=settings.retry_after,
+        )
+
+    def queue_for(self, method: str, path: str) -> Optional[AdmissionQueue]:
+        """
+        Pick the admission queue for a request.
+
+        `/view` and the web UI are never queued, which gives embeds priority
+        over management traffic competing for the disk and DB connection.
+        """
+        if not path.startswith("/api/") or path in UNLIMITED_PATHS:
+            return None
+        if method == "POST" and UPLOAD_PATH.match(path):
+            return self.uploads
+        return self.management
+
+    def bucket_for(self, client: str) -> Optional[TokenBucket]:
+        """Get the upload rate limiter for a client, if rate limiting is enabled."""
+        if self.upload_rate_limit <= 0:
+            return None
+
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            if len(self._buckets) >= 1024:
+                # Forget clients that have fully recovered their allowance
+                self._buckets = {k: b for k, b in self._buckets.items() if not b.idle}
+            bucket = self._buckets[client] = TokenBucket(
+                self.upload_rate_limit, self.upload_rate_limit
+            )
+        return bucket
+
+    def metrics(self) -> Dict[str, Dict[str, int]]:
+        """Snapshot of all admission queues."""
+        return {
+            "uploads": self.uploads.metrics(),
+            "management": self.management.metrics(),
+        }
+
+
+class AdmissionMiddleware:
+    """ASGI middleware applying admission control before request bodies are read."""
+
+    def __init__(self, app, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        queue = self.controller.queue_for(scope["method"], scope["path"])
+        if queue is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not await queue.acquire():
+            await self._reject(send)
+            return
+
+        try:
+            if queue is self.controller.uploads:
+                client = scope["client"][0] if scope.get("client") else "unknown"
+                bucket = self.controller.bucket_for(client)
+                if bucket is not None:
+                    receive = self._throttled(receive, bucket)
+            await self.app(scope, receive, send)
+        finally:
+            queue.release()
+
+    @staticmethod
+    def _throttled(receive, bucket: TokenBucket):
+        async def throttled_receive():
+            message = await receive()
+            if message["type"] == "http.request":
+                await bucket.consume(len(message.get("body", b"")))
+            return message
+        return throttled_receive
+
+    async def _reject(self, send):
+        body = json.dumps({"detail": "Server is busy, please retry later"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(self.controller.retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,158 @@
+"""Opt-in per-request profiling with flamegraph-compatible output."""
+
+import asyncio
+import heapq
+import hmac
+import itertools
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import List, Tuple
+
+
+# Header carrying the admin token; never a query parameter, which would end up in access logs
+PROFILE_HEADER = b"x-framebox-profile"
+
+# Request paths eligible for 1-in-N sampling
+SAMPLED_PREFIXES = ("/view/", "/api/projects")
+
+
+class StackSampler:
+    """
+    Wall-clock sampling profiler for a single thread.
+
+    A daemon thread periodically captures the target thread's stack and counts
+    identical stacks, producing the "folded" format read by flamegraph.pl,
+    speedscope and inferno. Because requests share the event loop thread, the
+    samples also include any other work the loop did while the request ran.
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="framebox-profiler", daemon=True)
+
+    def start(self):
+        """Start sampling."""
+        self._thread.start()
+
+    def stop(self):
+        """Stop sampling and wait for the sampler thread to exit."""
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.counts[self._fold(frame)] += 1
+
+    @staticmethod
+    def _fold(frame) -> str:
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+            frame = frame.f_back
+        return ";".join(reversed(stack))
+
+    def folded(self) -> str:
+        """Render collected samples as folded stacks."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.counts.most_common())
+
+
+class ProfileStore:
+    """Writes profiles to disk, keeping only the slowest sampled traces."""
+
+    def __init__(self, output_dir: str, keep_slowest: int):
+        self.output_dir = Path(output_dir)
+        self.keep_slowest = keep_slowest
+        self._sampled: List[Tuple[float, int, Path]] = []
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def path_for(self, method: str, path: str) -> Path:
+        """Build a unique output path for a request."""
+        slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", path.strip("/"))[:80] or "root"
+        stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+        return self.output_dir / f"{stamp}-{method}-{slug}.folded"
+
+    def write(self, file_path: Path, folded: str, duration: float, sampled: bool):
+        """Write a profile; sampled profiles compete for the slowest-N slots."""
+        with self._lock:
+            if sampled and self.keep_slowest > 0 and len(self._sampled) >= self.keep_slowest:
+                if duration <= self._sampled[0][0]:
+                    return
+                _, _, evicted = heapq.heappop(self._sampled)
+                evicted.unlink(missing_ok=True)
+
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            file_path.write_text(folded)
+            if sampled:
+                heapq.heappush(self._sampled, (duration, next(self._counter), file_path))
+
+
+class ProfilingMiddleware:
+    """ASGI middleware that profiles admin-flagged requests and a 1-in-N sample."""
+
+    def __init__(self, app, store: ProfileStore, admin_token: str = "",
+                 sample_rate: int = 0, interval: float = 0.001):
+        self.app = app
+        self.store = store
+        self.admin_token = admin_token
+        self.sample_rate = sample_rate
+        self.interval = interval
+
+    def _is_requested(self, scope) -> bool:
+        if not self.admin_token:
+            return False
+
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER:
+                return hmac.compare_digest(value, self.admin_token.encode())
+        return False
+
+    def _is_sampled(self, scope) -> bool:
+        return (
+            self.sample_rate > 0
+            and scope["path"].startswith(SAMPLED_PREFIXES)
+            and random.randrange(self.sample_rate) == 0
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        requested = self._is_requested(scope)
+        if not requested and not self._is_sampled(scope):
+            await self.app(scope, receive, send)
+            return
+
+        file_path = self.store.path_for(scope["method"], scope["path"])
+
+        async def send_wrapper(message):
+            if requested and message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-file", file_path.name.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        sampler = StackSampler(threading.get_ident(), self.interval)
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - started
+            await asyncio.to_thread(sampler.stop)
+            await asyncio.to_thread(
+                self.store.write, file_path, sampler.folded(), duration, not requested
+            )
@@ -0,0 +1,41 @@
+"""Write rejection for read-only replicas."""
+
+import json
+
+
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# Non-read requests a replica still serves because they do not change replicated data
+REPLICA_ALLOWED_WRITES = {("POST", "/api/maintenance/backup")}
+
+
+class ReadOnlyMiddleware:
+    """ASGI middleware rejecting API writes while the node runs as a replica."""
+
+    def __init__(self, app, settings):
+        self.app = app
+        self.settings = settings
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] == "http"
+            and self.settings.replica_of
+            and scope["method"] not in READ_METHODS
+            and scope["path"].startswith("/api/")
+            and (scope["method"], scope["path"]) not in REPLICA_ALLOWED_WRITES
+        ):
+            body = json.dumps({
+                "detail": f"This node is a read-only replica; send writes to {self.settings.replica_of}"
+            }).encode()
+            await send({
+                "type": "http.response.start",
+                "status": 403,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        await self.app(scope, receive, send)
@@ -1,7 +1,7 @@
 """Pydantic models for request/response validation."""
 
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
 
 
 class ProjectCreate(BaseModel):
@@ -14,6 +14,7 @@ class ProjectUpdate(BaseModel):
     """Request model for updating a project."""
     name: Optional[str] = Field(None, min_length=1, max_length=100, description="New project name")
     entry_file: Optional[str] = Field(None, description="New entry file name")
+    quota_bytes: Optional[int] = Field(None, ge=0, description="Storage quota in bytes (0 for unlimited, null for the instance default)")
 
 
 class ProjectResponse(BaseModel):
@@ -23,6 +24,12 @@ class ProjectResponse(BaseModel):
     created_at: str
     updated_at: str
     entry_file: str
+    last_accessed_at: Optional[str] = None
+    archived: bool = False
+    file_count: int = 0
+    total_bytes: int = 0
+    last_upload_at: Optional[str] = None
+    quota_bytes: Optional[int] = None
 
 
 class FileInfo(BaseModel):
@@ -30,12 +37,14 @@ class FileInfo(BaseModel):
     filename: str
     size: int
     uploaded_at: str
+    sha256: Optional[str] = None
 
 
 class FileUploadResponse(BaseModel):
     """Response model for file upload."""
     uploaded: List[str]
     total_size: int
+    job_id: Optional[int] = None
 
 
 class ListProjectsResponse(BaseModel):
@@ -44,6 +53,133 @@ class ListProjectsResponse(BaseModel):
     total: int
 
 
+class StatsResponse(BaseModel):
+    """Response model for instance-wide storage usage."""
+    project_count: int
+    file_count: int
+    total_bytes: int
+
+
+class ReconcilerFinding(BaseModel):
+    """Model for a disk-vs-database drift finding."""
+    kind: str
+    project_id: str
+    filename: Optional[str] = None
+    detail: Optional[str] = None
+    repaired: bool
+    found_at: str
+
+
+class ReconcilerStatusResponse(BaseModel):
+    """Response model for reconciler progress."""
+    enabled: bool
+    repair: bool
+    phase: str
+    cursor: str
+    passes: int
+    pass_started_at: Optional[str] = None
+    last_pass_completed_at: Optional[str] = None
+    findings: List[ReconcilerFinding]
+
+
+class BackupSnapshot(BaseModel):
+    """Model for a backup snapshot manifest."""
+    name: str
+    started_at: str
+    completed_at: str
+    previous: Optional[str] = None
+    files_copied: int
+    files_linked: int
+    bytes_copied: int
+    missing: int
+
+
+class BackupStatusResponse(BaseModel):
+    """Response model for backup state."""
+    running: bool
+    last_result: Optional[BackupSnapshot] = None
+    last_error: Optional[str] = None
+    snapshots: List[BackupSnapshot]
+
+
+class JobResponse(BaseModel):
+    """Response model for a background job."""
+    id: int
+    kind: str
+    project_id: str
+    status: str
+    attempts: int
+    max_attempts: int
+    run_after: str
+    last_error: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+    created_at: str
+    updated_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    coalesced_into: Optional[int] = None
+
+
+class JobQueueStatusResponse(BaseModel):
+    """Response model for job queue state."""
+    workers: int
+    counts: Dict[str, int]
+
+
+class Change(BaseModel):
+    """Model for a change log entry."""
+    seq: int
+    kind: str
+    project_id: str
+    filename: Optional[str] = None
+    payload: Optional[Dict[str, Any]] = None
+    created_at: str
+
+
+class ChangeLogResponse(BaseModel):
+    """Response model for a page of the change log."""
+    oldest_seq: int
+    last_seq: int
+    changes: List[Change]
+
+
+class ReplicatedProject(BaseModel):
+    """Model for replicated project metadata."""
+    id: str
+    name: str
+    created_at: str
+    updated_at: str
+    entry_file: str
+    quota_bytes: Optional[int] = None
+
+
+class ReplicatedFile(BaseModel):
+    """Model for replicated file metadata."""
+    project_id: str
+    filename: str
+    size: int
+    uploaded_at: str
+
+
+class ReplicationSnapshotResponse(BaseModel):
+    """Response model for a full replication snapshot."""
+    last_seq: int
+    projects: List[ReplicatedProject]
+    files: List[ReplicatedFile]
+
+
+class ReplicationStatusResponse(BaseModel):
+    """Response model for replication progress and lag."""
+    role: str
+    primary: Optional[str] = None
+    applied_seq: Optional[int] = None
+    primary_last_seq: Optional[int] = None
+    lag_changes: Optional[int] = None
+    lag_seconds: float = 0.0
+    last_sync_at: Optional[str] = None
+    last_error: Optional[str] = None
+
+
 class HealthResponse(BaseModel):
     """Response model for health check."""
     status: str
@@ -56,3 +192,18 @@ class ServerInfoResponse(BaseModel):
     port: int
     local_ip: Optional[str] = None
     suggested_url: Optional[str] = None
+
+
+class QueueMetrics(BaseModel):
+    """Model for admission queue state."""
+    active: int
+    queued: int
+    rejected: int
+    limit: int
+    max_queue: int
+
+
+class MetricsResponse(BaseModel):
+    """Response model for runtime metrics."""
+    admission: Dict[str, QueueMetrics]
+    access_log_dropped: int = 0
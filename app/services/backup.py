@@ -0,0 +1,349 @@
+"""Online, incremental snapshots of the database and project files."""
+
+import asyncio
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+from datetime import datetime
+from itertools import groupby
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = "manifest.json"
+
+# Pages copied per online backup step; the database lock is released between steps
+BACKUP_PAGES_PER_STEP = 64
+BACKUP_STEP_SLEEP = 0.005
+
+# If concurrent writes keep restarting the stepped copy, finish in one step instead
+MAX_BACKUP_RESTARTS = 5
+
+
+class BackupInProgressError(Exception):
+    """Raised when a backup is requested while another one is running."""
+    pass
+
+
+class BackupManager:
+    """
+    Creates restorable snapshots under data/backups/<timestamp>/.
+
+    Each snapshot holds a copy of framebox.db made with the SQLite online
+    backup API in small page steps, plus the project files and archives it
+    references. Files uploaded before the previous snapshot are hard-linked
+    from it instead of copied, so unchanged data costs no extra space.
+    """
+
+    def __init__(self, db_path: str, projects_dir: str, archive_dir: str, backups_dir: str,
+                 keep: int = 7, interval: float = 0):
+        self.db_path = db_path
+        self.projects_dir = Path(projects_dir)
+        self.archive_dir = Path(archive_dir)
+        self.backups_dir = Path(backups_dir)
+        self.keep = keep
+        self.interval = interval
+        self.last_result: Optional[Dict[str, Any]] = None
+        self.last_error: Optional[str] = None
+        self._running = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_settings(cls, settings) -> "BackupManager":
+        """Build a manager from application settings."""
+        return cls(
+            settings.db_path,
+            settings.projects_dir,
+            settings.archive_dir,
+            settings.backups_dir,
+            keep=settings.backup_keep,
+            interval=settings.backup_interval,
+        )
+
+    @property
+    def running(self) -> bool:
+        """Whether a backup is currently in progress."""
+        return self._running.locked()
+
+    # Lifecycle
+
+    def start(self):
+        """Start scheduled backups if an interval is configured."""
+        if self.interval > 0:
+            self._task = asyncio.create_task(self._schedule_loop())
+
+    async def stop(self):
+        """Stop scheduled backups."""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _schedule_loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await asyncio.to_thread(self.create_snapshot)
+            except BackupInProgressError:
+                pass
+            except Exception:
+                logger.exception("Scheduled backup failed")
+
+    # Snapshots
+
+    def list_snapshots(self) -> List[Dict[str, Any]]:
+        """List completed snapshots, oldest first."""
+        snapshots = []
+        if not self.backups_dir.is_dir():
+            return snapshots
+        for entry in sorted(self.backups_dir.iterdir()):
+            manifest_path = entry / MANIFEST
+            if entry.is_dir() and not entry.name.startswith(".") and manifest_path.exists():
+                snapshots.append(json.loads(manifest_path.read_text()))
+        return snapshots
+
+    def create_snapshot(self) -> Dict[str, Any]:
+        """
+        Create a snapshot (blocking; call from a worker thread).
+
+        Returns:
+            The snapshot manifest
+
+        Raises:
+            BackupInProgressError: If another backup is running
+        """
+        if not self._running.acquire(blocking=False):
+            raise BackupInProgressError("A backup is already in progress")
+        try:
+            result = self._create_snapshot()
+            self.last_result, self.last_error = result, None
+            return result
+        except Exception as e:
+            self.last_error = str(e)
+            raise
+        finally:
+            self._running.release()
+
+    def _create_snapshot(self) -> Dict[str, Any]:
+        started_at = datetime.utcnow()
+        name = started_at.strftime("%Y%m%dT%H%M%S%fZ")
+        self.backups_dir.mkdir(parents=True, exist_ok=True)
+
+        snapshots = self.list_snapshots()
+        previous = snapshots[-1] if snapshots else None
+        previous_dir = self.backups_dir / previous["name"] if previous else None
+
+        partial_dir = self.backups_dir / f".{name}.partial"
+        shutil.rmtree(partial_dir, ignore_errors=True)
+        partial_dir.mkdir()
+
+        stats = {"files_copied": 0, "files_linked": 0, "bytes_copied": 0, "missing": 0}
+
+        # 1. Database: point-in-time copy that defines the snapshot contents
+        snapshot_db = partial_dir / "framebox.db"
+        self._backup_database(snapshot_db)
+
+        # 2. Files referenced by the snapshot database
+        conn = sqlite3.connect(snapshot_db)
+        conn.row_factory = sqlite3.Row
+        try:
+            files = conn.execute(
+                """
+                SELECT f.project_id, f.filename, f.size, f.uploaded_at, p.archived
+                FROM files f JOIN projects p ON p.id = f.project_id
+                ORDER BY f.project_id
+                """
+            ).fetchall()
+            moved: Dict[str, bool] = {}
+            for project_id, group in groupby(files, key=lambda row: row["project_id"]):
+                rows = list(group)
+                archived = bool(rows[0]["archived"])
+                missing = self._store_project(project_id, rows, archived, partial_dir,
+                                              previous, previous_dir, stats)
+                if missing:
+                    # Cold storage may have archived or rehydrated the project since the
+                    # database copy; take its current form and record that in the snapshot
+                    if archived:
+                        still_missing = self._store_project(project_id, rows, False, partial_dir,
+                                                            previous, previous_dir, stats)
+                        if still_missing == len(rows):
+                            shutil.rmtree(partial_dir / "projects" / project_id, ignore_errors=True)
+                    else:
+                        still_missing = missing
+                        if (not (self.projects_dir / project_id).is_dir()
+                                and (self.archive_dir / f"{project_id}.zip").exists()):
+                            shutil.rmtree(partial_dir / "projects" / project_id, ignore_errors=True)
+                            still_missing = self._store_project(project_id, rows, True, partial_dir,
+                                                                previous, previous_dir, stats)
+                    if still_missing < missing:
+                        moved[project_id] = not archived
+                        missing = still_missing
+                stats["missing"] += missing
+
+            if moved:
+                with conn:
+                    conn.executemany(
+                        "UPDATE projects SET archived = ? WHERE id = ?",
+                        [(int(now_archived), project_id) for project_id, now_archived in moved.items()]
+                    )
+        finally:
+            conn.close()
+
+        manifest = {
+            "name": name,
+            "started_at": started_at.isoformat(),
+            "completed_at": datetime.utcnow().isoformat(),
+            "previous": previous["name"] if previous else None,
+            **stats,
+        }
+        (partial_dir / MANIFEST).write_text(json.dumps(manifest, indent=2))
+        os.replace(partial_dir, self.backups_dir / name)
+
+        self._prune()
+        logger.info("Backup %s complete: %s", name, stats)
+        return manifest
+
+    def _backup_database(self, target_path: Path):
+        restarts = 0
+        last_remaining = None
+
+        def progress(status, remaining, total):
+            nonlocal restarts, last_remaining
+            if last_remaining is not None and remaining > last_remaining:
+                restarts += 1
+            last_remaining = remaining
+            if restarts > MAX_BACKUP_RESTARTS:
+                raise _BackupRestarting()
+
+        source = sqlite3.connect(self.db_path)
+        target = sqlite3.connect(target_path)
+        try:
+            try:
+                source.backup(target, pages=BACKUP_PAGES_PER_STEP, progress=progress,
+                              sleep=BACKUP_STEP_SLEEP)
+            except _BackupRestarting:
+                # Writers keep invalidating the stepped copy; take it in one short step
+                source.backup(target)
+        finally:
+            target.close()
+            source.close()
+
+    def _store_project(self, project_id: str, rows: List[sqlite3.Row], archived: bool, partial_dir: Path,
+                       previous: Optional[Dict[str, Any]], previous_dir: Optional[Path],
+                       stats: Dict[str, int]) -> int:
+        """Store a project's archive, or its files if expanded; returns the number of files missing."""
+        if archived:
+            relative = Path("archive") / f"{project_id}.zip"
+            stored = self._store(self.archive_dir / f"{project_id}.zip", partial_dir / relative,
+                                 previous_dir / relative if previous_dir else None, None, stats)
+            return 0 if stored else len(rows)
+
+        missing = 0
+        for row in rows:
+            relative = Path("projects") / project_id / row["filename"]
+            unchanged = (
+                previous is not None
+                and row["uploaded_at"] < previous["started_at"]
+            )
+            if not self._store(self.projects_dir / project_id / row["filename"],
+                               partial_dir / relative,
+                               previous_dir / relative if unchanged else None,
+                               row["size"], stats):
+                missing += 1
+        return missing
+
+    def _store(self, source: Path, target: Path, previous: Optional[Path],
+               expected_size: Optional[int], stats: Dict[str, int]) -> bool:
+        """
+        Hard-link a file from the previous snapshot when unchanged, otherwise copy it.
+
+        Returns:
+            False if the file is missing, or its copy does not have the expected size
+        """
+        target.parent.mkdir(parents=True, exist_ok=True)
+
+        if previous is not None and self._unchanged(source, previous, expected_size):
+            try:
+                os.link(previous, target)
+                stats["files_linked"] += 1
+                return True
+            except OSError:
+                pass  # e.g. snapshots on a different filesystem; fall back to copying
+
+        try:
+            shutil.copy2(source, target)
+        except FileNotFoundError:
+            return False
+        if expected_size is not None and target.stat().st_size != expected_size:
+            # Replaced by an upload after the database copy; the snapshot row describes the old file
+            target.unlink()
+            return False
+        stats["files_copied"] += 1
+        stats["bytes_copied"] += target.stat().st_size
+        return True
+
+    @staticmethod
+    def _unchanged(source: Path, previous: Path, expected_size: Optional[int]) -> bool:
+        """Check a previous snapshot's copy against the recorded size, or the source's size and mtime."""
+        try:
+            previous_stat = previous.stat()
+            if expected_size is not None:
+                return previous_stat.st_size == expected_size
+            source_stat = source.stat()
+        except FileNotFoundError:
+            return False
+        return (previous_stat.st_size, previous_stat.st_mtime_ns) == (
+            source_stat.st_size, source_stat.st_mtime_ns
+        )
+
+    def _prune(self):
+        if self.keep <= 0:
+            return
+        snapshots = self.list_snapshots()
+        for snapshot in snapshots[:-self.keep]:
+            shutil.rmtree(self.backups_dir / snapshot["name"], ignore_errors=True)
+
+    def status(self) -> Dict[str, Any]:
+        """Get backup state and available snapshots."""
+        return {
+            "running": self.running,
+            "last_result": self.last_result,
+            "last_error": self.last_error,
+            "snapshots": self.list_snapshots(),
+        }
+
+
+class _BackupRestarting(Exception):
+    """Internal signal to abandon a stepped backup that keeps restarting."""
+    pass
+
+
+# Global backup manager instance
+backup_manager: Optional[BackupManager] = None
+
+
+def get_backup_manager() -> BackupManager:
+    """Get the global backup manager instance."""
+    if backup_manager is None:
+        raise RuntimeError("Backup manager not initialized. Call init_backup_manager() first.")
+    return backup_manager
+
+
+async def init_backup_manager(settings):
+    """Initialize the global backup manager and start scheduled backups."""
+    global backup_manager
+    backup_manager = BackupManager.from_settings(settings)
+    backup_manager.start()
+
+
+async def close_backup_manager():
+    """Stop the global backup manager."""
+    global backup_manager
+    if backup_manager:
+        await backup_manager.stop()
+        backup_manager = None
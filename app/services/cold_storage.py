@@ -0,0 +1,284 @@
+"""Tiered cold storage: access tracking, archival and lazy rehydration of idle projects."""
+
+import asyncio
+import logging
+import os
+import shutil
+import zipfile
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import IO, Dict, List, Optional, Set, Tuple
+
+from app.database import get_db
+
+
+logger = logging.getLogger(__name__)
+
+
+def open_from_archive(archive_path: Path, filename: str) -> Optional[Tuple[IO[bytes], int]]:
+    """
+    Open a single file of a project archive for reading without rehydrating it (blocking).
+
+    The returned stream stays readable if the archive is removed meanwhile.
+
+    Returns:
+        The member's (stream, size), or None if the archive or member does not exist
+    """
+    try:
+        with zipfile.ZipFile(archive_path) as zf:
+            info = zf.getinfo(filename)
+            return zf.open(info), info.file_size
+    except (FileNotFoundError, KeyError):
+        return None
+
+
+class ArchiveMissingError(Exception):
+    """Raised when an archived project's archive file cannot be found."""
+    pass
+
+
+class AccessTracker:
+    """Collects per-project access times in memory and flushes them to the database in batches."""
+
+    def __init__(self):
+        self._pending: Dict[str, str] = {}
+        # Latest access per project seen by this process; unlike _pending, never cleared by flush
+        self._last_access: Dict[str, str] = {}
+
+    def touch(self, project_id: str):
+        """Record an access without touching the database."""
+        now = datetime.utcnow().isoformat()
+        self._pending[project_id] = now
+        self._last_access[project_id] = now
+
+    def accessed_since(self, project_id: str, since: str) -> bool:
+        """Check whether this process saw an access at or after `since`, flushed or not."""
+        accessed_at = self._last_access.get(project_id)
+        return accessed_at is not None and accessed_at >= since
+
+    def forget(self, project_id: str):
+        """Drop the access history of a deleted project."""
+        self._pending.pop(project_id, None)
+        self._last_access.pop(project_id, None)
+
+    async def flush(self):
+        """Write all pending accesses in a single transaction."""
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, {}
+        try:
+            await get_db().record_accesses(batch)
+        except Exception:
+            # Keep the newest timestamp per project so nothing is lost on retry
+            for project_id, accessed_at in batch.items():
+                if self._pending.get(project_id, "") < accessed_at:
+                    self._pending[project_id] = accessed_at
+            raise
+
+
+class ColdStorage:
+    """Moves idle projects into compressed archives and restores them on demand."""
+
+    def __init__(self, projects_dir: str, archive_dir: str, idle_days: float,
+                 check_interval: float, flush_interval: float):
+        self.projects_dir = Path(projects_dir)
+        self.archive_dir = Path(archive_dir)
+        self.idle_days = idle_days
+        self.check_interval = check_interval
+        self.flush_interval = flush_interval
+        self.tracker = AccessTracker()
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._archiving: Set[str] = set()
+        self._tasks: List[asyncio.Task] = []
+
+    def archive_path(self, project_id: str) -> Path:
+        """Get the archive file path for a project."""
+        return self.archive_dir / f"{project_id}.zip"
+
+    def lock(self, project_id: str) -> asyncio.Lock:
+        """Get the lock serializing archival, rehydration and maintenance of a project."""
+        lock = self._locks.get(project_id)
+        if lock is None:
+            lock = self._locks[project_id] = asyncio.Lock()
+        return lock
+
+    # Lifecycle
+
+    def start(self):
+        """Start the background flush and archival loops."""
+        self._tasks.append(asyncio.create_task(self._flush_loop()))
+        if self.idle_days > 0:
+            self._tasks.append(asyncio.create_task(self._archive_loop()))
+
+    async def stop(self):
+        """Stop background loops and flush outstanding access records."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        await self.tracker.flush()
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.tracker.flush()
+            except Exception:
+                logger.exception("Failed to flush project access times")
+
+    async def _archive_loop(self):
+        while True:
+            try:
+                await self.archive_idle_projects()
+            except Exception:
+                logger.exception("Cold storage archival pass failed")
+            await asyncio.sleep(self.check_interval)
+
+    # Archival
+
+    async def archive_idle_projects(self) -> int:
+        """Archive every project idle longer than the configured threshold."""
+        await self.tracker.flush()
+        cutoff = (datetime.utcnow() - timedelta(days=self.idle_days)).isoformat()
+        project_ids = await get_db().list_idle_projects(cutoff)
+
+        archived = 0
+        for project_id in project_ids:
+            if await self.archive_project(project_id, idle_since=cutoff):
+                archived += 1
+        return archived
+
+    async def archive_project(self, project_id: str, idle_since: Optional[str] = None) -> bool:
+        """
+        Compress a project directory into the archive and remove the expanded copy.
+
+        Args:
+            project_id: Project to archive
+            idle_since: Give up if the project was accessed at or after this time
+                (defaults to when archiving starts)
+
+        Returns:
+            True if the project was archived
+        """
+        async with self.lock(project_id):
+            project = await get_db().get_project_by_id(project_id)
+            if not project or project["archived"]:
+                return False
+
+            project_dir = self.projects_dir / project_id
+            if not project_dir.is_dir():
+                return False
+
+            since = idle_since or datetime.utcnow().isoformat()
+            if self.tracker.accessed_since(project_id, since):
+                return False
+
+            # Requests that see the project as expanded from here on wait for the lock
+            self._archiving.add(project_id)
+            try:
+                await asyncio.to_thread(self._write_archive, project_dir, self.archive_path(project_id))
+
+                # A request arrived since the project was found idle; keep it hot
+                if self.tracker.accessed_since(project_id, since):
+                    self.archive_path(project_id).unlink(missing_ok=True)
+                    return False
+
+                await get_db().set_project_archived(project_id, True)
+                await asyncio.to_thread(shutil.rmtree, project_dir, True)
+            finally:
+                self._archiving.discard(project_id)
+            logger.info("Archived idle project %s", project_id)
+            return True
+
+    def _write_archive(self, project_dir: Path, archive_path: Path):
+        archive_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = archive_path.with_suffix(".zip.tmp")
+        with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+            for root, _, filenames in os.walk(project_dir):
+                for filename in filenames:
+                    file_path = Path(root) / filename
+                    zf.write(file_path, file_path.relative_to(project_dir).as_posix())
+        os.replace(tmp_path, archive_path)
+
+    # Rehydration
+
+    async def ensure_hydrated(self, project: Dict) -> None:
+        """
+        Make sure a project's files are expanded on disk.
+
+        Concurrent callers for the same project wait on a single rehydration.
+
+        Args:
+            project: Project row as returned by the database layer
+
+        Raises:
+            ArchiveMissingError: If the project is archived but its archive is gone;
+                it stays archived so the loss is not hidden
+        """
+        project_id = project["id"]
+        # An expanded project being archived right now may lose its directory; wait it out
+        if not project.get("archived") and project_id not in self._archiving:
+            return
+
+        async with self.lock(project_id):
+            # Another request may have finished rehydrating while we waited
+            current = await get_db().get_project_by_id(project_id)
+            if not current or not current["archived"]:
+                return
+
+            try:
+                await asyncio.to_thread(self._extract_archive, project_id)
+            except ArchiveMissingError:
+                logger.error("Archive of project %s is missing; leaving it archived", project_id)
+                raise
+            await get_db().set_project_archived(project_id, False)
+            self.archive_path(project_id).unlink(missing_ok=True)
+            logger.info("Rehydrated project %s from cold storage", project_id)
+
+    def _extract_archive(self, project_id: str):
+        project_dir = self.projects_dir / project_id
+        tmp_dir = self.projects_dir / f".{project_id}.rehydrate"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        archive_path = self.archive_path(project_id)
+        try:
+            with zipfile.ZipFile(archive_path) as zf:
+                zf.extractall(tmp_dir)
+        except FileNotFoundError:
+            raise ArchiveMissingError(f"Archive of project '{project_id}' is missing")
+
+        shutil.rmtree(project_dir, ignore_errors=True)
+        os.replace(tmp_dir, project_dir)
+
+    def discard(self, project_id: str):
+        """Remove any archive kept for a deleted project."""
+        self.archive_path(project_id).unlink(missing_ok=True)
+        self._locks.pop(project_id, None)
+        self.tracker.forget(project_id)
+
+
+# Global cold storage instance
+cold_storage: Optional[ColdStorage] = None
+
+
+def get_cold_storage() -> ColdStorage:
+    """Get the global cold storage instance."""
+    if cold_storage is None:
+        raise RuntimeError("Cold storage not initialized. Call init_cold_storage() first.")
+    return cold_storage
+
+
+async def init_cold_storage(projects_dir: str, archive_dir: str, idle_days: float,
+                            check_interval: float, flush_interval: float):
+    """Initialize the global cold storage instance and start its background loops."""
+    global cold_storage
+    cold_storage = ColdStorage(projects_dir, archive_dir, idle_days, check_interval, flush_interval)
+    cold_storage.start()
+
+
+async def close_cold_storage():
+    """Stop the global cold storage instance."""
+    global cold_storage
+    if cold_storage:
+        await cold_storage.stop()
+        cold_storage = None
@@ -0,0 +1,342 @@
+"""Bulk import of project directories straight into storage and the database."""
+
+import asyncio
+import logging
+import os
+import shutil
+import sqlite3
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+from app.database import Database
+from app.services.processing import PROCESS_PROJECT
+from app.utils.file_validation import validate_filename, validate_file_size, ValidationError
+from app.utils.id_generator import generate_id
+
+
+logger = logging.getLogger(__name__)
+
+# Same limit as ProjectCreate.name
+MAX_NAME_LENGTH = 100
+
+# Attempts at drawing an unused project ID, as in generate_unique_id
+MAX_ID_ATTEMPTS = 10
+
+
+class ImportedProject:
+    """Progress of one source directory during an import."""
+
+    __slots__ = ("source", "project_id", "failed")
+
+    def __init__(self, source: str, project_id: str):
+        self.source = source
+        self.project_id = project_id
+        self.failed = False
+
+
+class Importer:
+    """
+    Imports a directory tree with one subdirectory per project, bypassing the HTTP API.
+
+    Each subdirectory becomes a project named after it. Files are copied (or
+    hard-linked) by a thread pool while their rows are written in large
+    transactions. Every source directory is recorded in import_sources and
+    only marked complete by the transaction that writes its last file row,
+    so running the same import again resumes an interrupted one: completed
+    directories are skipped and files already recorded are not copied again.
+    """
+
+    def __init__(self, db_path: str, projects_dir: str, link: bool = False, workers: int = 8,
+                 batch_size: int = 5000, quota_bytes: int = 0, job_max_attempts: int = 3,
+                 progress_interval: float = 2.0, output: Callable[[str], None] = print):
+        self.db_path = db_path
+        self.projects_dir = Path(projects_dir)
+        self.link = link
+        self.workers = workers
+        self.batch_size = batch_size
+        self.quota_bytes = quota_bytes
+        self.job_max_attempts = job_max_attempts
+        self.progress_interval = progress_interval
+        self.output = output
+        self.stats = {
+            "projects_created": 0, "projects_resumed": 0, "projects_skipped": 0,
+            "files_imported": 0, "bytes_imported": 0, "files_skipped": 0, "files_failed": 0,
+        }
+        self._conn: Optional[sqlite3.Connection] = None
+        self._taken_ids: set = set()
+        self._taken_names: set = set()
+        self._imported: Dict[str, Tuple[str, Optional[str]]] = {}
+        self._project_rows: List[tuple] = []
+        self._source_rows: List[tuple] = []
+        self._file_rows: List[tuple] = []
+        self._completed: List[ImportedProject] = []
+        self._started = 0.0
+        self._last_report = 0.0
+
+    @classmethod
+    def from_settings(cls, settings, **kwargs) -> "Importer":
+        """Build an importer from application settings."""
+        return cls(
+            settings.db_path,
+            settings.projects_dir,
+            quota_bytes=settings.project_quota_bytes,
+            job_max_attempts=settings.job_max_attempts,
+            **kwargs
+        )
+
+    # Running
+
+    def run(self, source_root: str) -> Dict[str, Any]:
+        """
+        Import every subdirectory of `source_root` (blocking).
+
+        Returns:
+            Import statistics, including files per second
+        """
+        root = Path(source_root)
+        if not root.is_dir():
+            raise NotADirectoryError(f"'{source_root}' is not a directory")
+
+        asyncio.run(self._init_schema())
+        self._conn = sqlite3.connect(self.db_path, timeout=30)
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        try:
+            self._load_state()
+            self._started = self._last_report = time.perf_counter()
+
+            # Results are consumed in submission order, so a project is complete
+            # once the marker queued after its last file is reached
+            try:
+                with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                    in_flight: Deque[Tuple[Optional[Future], Any]] = deque()
+                    for task in self._tasks(root):
+                        future = pool.submit(self._place, *task[1:]) if task[0] == "file" else None
+                        in_flight.append((future, task))
+                        if len(in_flight) >= self.workers * 4:
+                            self._finish(*in_flight.popleft())
+                    while in_flight:
+                        self._finish(*in_flight.popleft())
+            finally:
+                # Also on interruption: rows are only buffered for files already in place
+                self._flush()
+        finally:
+            self._conn.close()
+            self._conn = None
+
+        elapsed = time.perf_counter() - self._started
+        return {
+            **self.stats,
+            "elapsed": round(elapsed, 3),
+            "files_per_second": round(self.stats["files_imported"] / elapsed, 1) if elapsed > 0 else 0.0,
+        }
+
+    async def _init_schema(self):
+        db = Database(self.db_path)
+        try:
+            await db.init_db()
+        finally:
+            await db.close()
+
+    def _load_state(self):
+        self._taken_ids = {row[0] for row in self._conn.execute("SELECT id FROM projects")}
+        self._taken_names = {row[0] for row in self._conn.execute("SELECT name FROM projects")}
+        self._imported = {
+            row[0]: (row[1], row[2])
+            for row in self._conn.execute("SELECT source, project_id, completed_at FROM import_sources")
+        }
+
+    # Planning
+
+    def _tasks(self, root: Path) -> Iterator[tuple]:
+        """Yield ("file", project, source, target, relative, size) tasks and a ("done", project) marker per project."""
+        directories = sorted(
+            (entry for entry in os.scandir(root)
+             if entry.is_dir(follow_symlinks=False) and not entry.name.startswith(".")),
+            key=lambda entry: entry.name
+        )
+        for entry in directories:
+            source = str(Path(entry.path).resolve())
+            if self._imported.get(source, (None, None))[1]:
+                self.stats["projects_skipped"] += 1
+                continue
+
+            files = self._scan(Path(source))
+            project = self._start_project(entry.name, source, files)
+            if project is None:
+                continue
+
+            # Files recorded by an interrupted run are not copied again
+            recorded = dict(self._conn.execute(
+                "SELECT filename, size FROM files WHERE project_id = ?", (project.project_id,)
+            ))
+
+            project_dir = self.projects_dir / project.project_id
+            project_dir.mkdir(parents=True, exist_ok=True)
+            for path, relative, size in files:
+                if recorded.get(relative) == size:
+                    self.stats["files_skipped"] += 1
+                    continue
+                yield ("file", project, path, project_dir / relative, relative, size)
+            yield ("done", project)
+
+    def _scan(self, source: Path) -> List[Tuple[Path, str, int]]:
+        """List (path, validated relative name, size) of the regular files under a directory."""
+        files = []
+        for directory, dirnames, filenames in os.walk(source):
+            dirnames.sort()
+            for name in sorted(filenames):
+                path = Path(directory) / name
+                relative = path.relative_to(source).as_posix()
+                try:
+                    if path.is_symlink() or not path.is_file():
+                        raise ValidationError("Not a regular file")
+                    size = path.stat().st_size
+                    validate_file_size(size)
+                    files.append((path, validate_filename(relative), size))
+                except ValidationError as e:
+                    logger.warning("Skipping %s: %s", path, e)
+                    self.stats["files_skipped"] += 1
+        return files
+
+    def _start_project(self, name: str, source: str,
+                       files: List[Tuple[Path, str, int]]) -> Optional[ImportedProject]:
+        """Resume or create the project for an incomplete source directory; None if it is skipped."""
+        if source in self._imported:
+            project_id, _ = self._imported[source]
+            if project_id in self._taken_ids:
+                self.stats["projects_resumed"] += 1
+                return ImportedProject(source, project_id)
+            # The project was deleted since the interrupted run; import it afresh
+
+        if not 1 <= len(name) <= MAX_NAME_LENGTH or name in self._taken_names:
+            logger.warning("Skipping %s: project name '%s' is invalid or already taken", source, name)
+            self.stats["projects_skipped"] += 1
+            return None
+
+        total_bytes = sum(size for _, _, size in files)
+        if self.quota_bytes > 0 and total_bytes > self.quota_bytes:
+            logger.warning("Skipping %s: %d bytes exceeds the project quota of %d bytes",
+                           source, total_bytes, self.quota_bytes)
+            self.stats["projects_skipped"] += 1
+            return None
+
+        project_id = self._new_id()
+        now = datetime.utcnow().isoformat()
+        self._taken_ids.add(project_id)
+        self._taken_names.add(name)
+        self._imported[source] = (project_id, None)
+        self._project_rows.append((project_id, name, now, now, self._entry_file(files)))
+        self._source_rows.append((source, project_id, now))
+        self.stats["projects_created"] += 1
+        return ImportedProject(source, project_id)
+
+    def _new_id(self) -> str:
+        """Draw an unused project ID with the same retries and failure as generate_unique_id."""
+        for _ in range(MAX_ID_ATTEMPTS):
+            project_id = generate_id()
+            if project_id not in self._taken_ids:
+                return project_id
+        raise RuntimeError(f"Failed to generate unique ID after {MAX_ID_ATTEMPTS} attempts")
+
+    @staticmethod
+    def _entry_file(files: List[Tuple[Path, str, int]]) -> str:
+        """Use index.html, else the first top-level HTML file."""
+        top_level = [relative for _, relative, _ in files if "/" not in relative]
+        if "index.html" in top_level:
+            return "index.html"
+        html = [relative for relative in top_level if relative.lower().endswith((".html", ".htm"))]
+        return html[0] if html else "index.html"
+
+    # Copying
+
+    def _place(self, project: ImportedProject, source: Path, target: Path, relative: str, size: int):
+        """Copy or hard-link one file into project storage (runs in the pool)."""
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if self.link:
+            target.unlink(missing_ok=True)
+            try:
+                os.link(source, target)
+                return
+            except OSError:
+                pass  # e.g. a different filesystem; fall back to copying
+        shutil.copyfile(source, target)
+
+    def _finish(self, future: Optional[Future], task: tuple):
+        project: ImportedProject = task[1]
+        if task[0] == "done":
+            # A directory with failed files stays incomplete, so the next run retries it
+            if not project.failed:
+                self._completed.append(project)
+        else:
+            _, _, source, _, relative, size = task
+            try:
+                future.result()
+            except OSError as e:
+                logger.warning("Failed to import %s: %s", source, e)
+                project.failed = True
+                self.stats["files_failed"] += 1
+            else:
+                self._file_rows.append((project.project_id, relative, size, datetime.utcnow().isoformat()))
+                self.stats["files_imported"] += 1
+                self.stats["bytes_imported"] += size
+
+        if len(self._file_rows) >= self.batch_size:
+            self._flush()
+        if time.perf_counter() - self._last_report >= self.progress_interval:
+            self._report()
+
+    # Writing
+
+    def _flush(self):
+        """Write buffered rows in one transaction."""
+        now = datetime.utcnow().isoformat()
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO projects (id, name, created_at, updated_at, entry_file) VALUES (?, ?, ?, ?, ?)",
+                self._project_rows
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO import_sources (source, project_id, started_at) VALUES (?, ?, ?)",
+                self._source_rows
+            )
+            self._conn.executemany(
+                """
+                INSERT INTO files (project_id, filename, size, uploaded_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(project_id, filename)
+                DO UPDATE SET size = excluded.size, uploaded_at = excluded.uploaded_at, sha256 = NULL
+                """,
+                self._file_rows
+            )
+            self._conn.executemany(
+                "UPDATE import_sources SET completed_at = ? WHERE source = ?",
+                [(now, project.source) for project in self._completed]
+            )
+            # Digests are computed by the server's job workers, as after an upload
+            self._conn.executemany(
+                """
+                INSERT INTO jobs (kind, project_id, max_attempts, run_after, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(kind, project_id) WHERE status = 'pending' DO NOTHING
+                """,
+                [(PROCESS_PROJECT, project.project_id, self.job_max_attempts, now, now, now)
+                 for project in self._completed]
+            )
+        for project in self._completed:
+            self._imported[project.source] = (project.project_id, now)
+        self._project_rows, self._source_rows, self._file_rows, self._completed = [], [], [], []
+
+    def _report(self):
+        self._last_report = time.perf_counter()
+        elapsed = self._last_report - self._started
+        rate = self.stats["files_imported"] / elapsed if elapsed > 0 else 0.0
+        self.output(
+            f"{self.stats['files_imported']} files ({self.stats['bytes_imported'] / 1024 / 1024:.1f} MB) "
+            f"in {self.stats['projects_created'] + self.stats['projects_resumed']} projects, "
+            f"{rate:.0f} files/s"
+        )
@@ -0,0 +1,166 @@
+"""Persistent background job queue processed by a pool of in-process workers."""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.database import get_db
+
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[str], Awaitable[Dict[str, Any]]]
+
+
+class JobQueue:
+    """
+    Runs jobs stored in the jobs table on a fixed number of worker tasks.
+
+    Jobs are keyed by kind and project: enqueueing while a job of the same
+    kind is still pending for the project returns that job instead of adding
+    another, so bursts of uploads coalesce into one run. Failed attempts are
+    retried with exponential backoff, and jobs left running by a crashed
+    process are queued again on startup.
+    """
+
+    def __init__(self, workers: int = 2, max_attempts: int = 3, retry_delay: float = 5.0,
+                 poll_interval: float = 1.0, keep: int = 1000):
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.poll_interval = poll_interval
+        self.keep = keep
+        self.handlers: Dict[str, JobHandler] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+
+    @classmethod
+    def from_settings(cls, settings) -> "JobQueue":
+        """Build a queue from application settings."""
+        return cls(
+            workers=settings.job_workers,
+            max_attempts=settings.job_max_attempts,
+            retry_delay=settings.job_retry_delay,
+            poll_interval=settings.job_poll_interval,
+            keep=settings.job_keep,
+        )
+
+    def register(self, kind: str, handler: JobHandler):
+        """Register the coroutine that processes jobs of a kind; it receives the project ID."""
+        self.handlers[kind] = handler
+
+    async def enqueue(self, kind: str, project_id: str) -> Dict[str, Any]:
+        """
+        Queue a job for a project.
+
+        Returns:
+            The new job, or the already pending job it was coalesced into
+        """
+        job = await get_db().enqueue_job(kind, project_id, self.max_attempts)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job
+
+    # Lifecycle
+
+    async def start(self):
+        """Requeue interrupted jobs and start the workers."""
+        requeued = await get_db().requeue_running_jobs()
+        if requeued:
+            logger.info("Requeued %d interrupted job(s)", requeued)
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        """Stop the workers; jobs they were running are requeued on the next start."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._wakeup = None
+
+    async def _worker(self):
+        while True:
+            # Polling also picks up retries whose backoff has elapsed
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                while await self.run_next():
+                    pass
+            except Exception:
+                logger.exception("Job worker failed")
+
+    # Execution
+
+    async def run_next(self) -> bool:
+        """
+        Run the next due job, if any.
+
+        Returns:
+            True if a job was run
+        """
+        db = get_db()
+        job = await db.claim_job()
+        if job is None:
+            return False
+
+        handler = self.handlers.get(job["kind"])
+        try:
+            if handler is None:
+                raise LookupError(f"No handler for job kind '{job['kind']}'")
+            result = await handler(job["project_id"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            retry = handler is not None and job["attempts"] < job["max_attempts"]
+            retry_at = None
+            if retry:
+                delay = self.retry_delay * 2 ** (job["attempts"] - 1)
+                retry_at = (datetime.utcnow() + timedelta(seconds=delay)).isoformat()
+            logger.warning("Job %s (%s for %s) failed on attempt %d: %s",
+                           job["id"], job["kind"], job["project_id"], job["attempts"], e)
+            await db.fail_job(job["id"], str(e), retry_at)
+        else:
+            await db.complete_job(job["id"], result or {})
+
+        await db.prune_jobs(self.keep)
+        return True
+
+    async def status(self) -> Dict[str, Any]:
+        """Get worker count and job counts by status."""
+        return {
+            "workers": len(self._tasks),
+            "counts": await get_db().count_jobs(),
+        }
+
+
+# Global job queue instance
+job_queue: Optional[JobQueue] = None
+
+
+def get_job_queue() -> JobQueue:
+    """Get the global job queue instance."""
+    if job_queue is None:
+        raise RuntimeError("Job queue not initialized. Call init_job_queue() first.")
+    return job_queue
+
+
+async def init_job_queue(settings, handlers: Dict[str, JobHandler]):
+    """Initialize the global job queue, register handlers and start its workers."""
+    global job_queue
+    job_queue = JobQueue.from_settings(settings)
+    for kind, handler in handlers.items():
+        job_queue.register(kind, handler)
+    await job_queue.start()
+
+
+async def close_job_queue():
+    """Stop the global job queue."""
+    global job_queue
+    if job_queue:
+        await job_queue.stop()
+        job_queue = None
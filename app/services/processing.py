@@ -0,0 +1,64 @@
+"""Post-upload processing of project files, run as background jobs."""
+
+import asyncio
+import hashlib
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from app.config import settings
+from app.database import get_db
+from app.services.cold_storage import get_cold_storage
+
+
+# Job kind queued by uploads
+PROCESS_PROJECT = "process_project"
+
+
+def _hash_file(path: Path) -> Optional[Tuple[str, int]]:
+    """Return a file's (sha256, size), or None if it does not exist."""
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(path, "rb") as f:
+            while chunk := f.read(1024 * 1024):
+                digest.update(chunk)
+                size += len(chunk)
+    except FileNotFoundError:
+        return None
+    return digest.hexdigest(), size
+
+
+async def process_project(project_id: str) -> Dict[str, Any]:
+    """
+    Hash newly uploaded files of a project and check them against their rows.
+
+    Only files without a digest are read, so a job covers every upload made
+    since the previous one. Missing files and size mismatches are reported in
+    the result; repairing them is left to the reconciler.
+    """
+    db = get_db()
+    result: Dict[str, Any] = {"hashed": 0, "missing": [], "size_mismatch": []}
+
+    # Hold the cold storage lock so archival cannot remove files while they are read
+    async with get_cold_storage().lock(project_id):
+        project = await db.get_project_by_id(project_id)
+        if not project:
+            return {**result, "skipped": "project deleted"}
+        if project["archived"]:
+            return {**result, "skipped": "project archived"}
+
+        project_dir = Path(settings.projects_dir) / project_id
+        for row in await db.list_unhashed_files(project_id):
+            hashed = await asyncio.to_thread(_hash_file, project_dir / row["filename"])
+            if hashed is None:
+                result["missing"].append(row["filename"])
+                continue
+
+            sha256, size = hashed
+            if size != row["size"]:
+                result["size_mismatch"].append(row["filename"])
+                continue
+            if await db.set_file_digest(project_id, row["filename"], row["uploaded_at"], sha256):
+                result["hashed"] += 1
+
+    return result
@@ -0,0 +1,268 @@
+"""Incremental background reconciliation of project files on disk against the database."""
+
+import asyncio
+import logging
+import os
+import shutil
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from app.database import get_db
+from app.services.cold_storage import get_cold_storage
+
+
+logger = logging.getLogger(__name__)
+
+# Drift kinds reported by the reconciler
+ORPHAN_DIRECTORY = "orphan_directory"
+MISSING_DIRECTORY = "missing_directory"
+UNTRACKED_FILE = "untracked_file"
+MISSING_FILE = "missing_file"
+SIZE_MISMATCH = "size_mismatch"
+
+
+class Reconciler:
+    """
+    Walks the projects table and data/projects in small batches and repairs drift.
+
+    A pass has two phases: "projects" compares each project's file rows with
+    its directory, and "directories" looks for directories without a project
+    row. Progress is persisted after every batch, so a restart resumes where
+    the previous process stopped. Filesystem work runs in a worker thread and
+    batches are spaced out, so serving is not delayed.
+    """
+
+    def __init__(self, projects_dir: str, batch_size: int, interval: float,
+                 pass_interval: float, repair: bool, grace_seconds: float):
+        self.projects_dir = Path(projects_dir)
+        self.batch_size = batch_size
+        self.interval = interval
+        self.pass_interval = pass_interval
+        self.repair = repair
+        self.grace_seconds = grace_seconds
+        self.state: Dict[str, str] = {}
+        # When each missing file of a project was first seen missing; rows are only removed once confirmed
+        self._missing_since: Dict[str, Dict[str, float]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    # Lifecycle
+
+    def start(self):
+        """Start the background reconciliation loop."""
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the background loop."""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        self.state = {"phase": "projects", "cursor": "", "passes": "0"}
+        self.state.update(await get_db().get_reconciler_state())
+        while True:
+            try:
+                finished_pass = await self.step()
+            except Exception:
+                logger.exception("Reconciler step failed")
+                finished_pass = False
+            await asyncio.sleep(self.pass_interval if finished_pass else self.interval)
+
+    # Scanning
+
+    async def step(self) -> bool:
+        """
+        Reconcile one batch and persist progress.
+
+        Returns:
+            True if this batch completed a full pass
+        """
+        db = get_db()
+        finished_pass = False
+
+        if not self.state.get("cursor") and self.state.get("phase") == "projects":
+            self.state["pass_started_at"] = datetime.utcnow().isoformat()
+
+        if self.state.get("phase") == "projects":
+            rows = await db.list_projects_after(self.state.get("cursor", ""), self.batch_size)
+            for row in rows:
+                await self._check_project(row["id"])
+            if len(rows) < self.batch_size:
+                self.state.update(phase="directories", cursor="")
+            else:
+                self.state["cursor"] = rows[-1]["id"]
+        else:
+            names = await asyncio.to_thread(
+                self._list_directories_after, self.state.get("cursor", ""), self.batch_size
+            )
+            existing = await db.get_existing_project_ids(names)
+            for name in names:
+                if name not in existing:
+                    await self._handle_orphan_directory(name)
+            if len(names) < self.batch_size:
+                self.state.update(
+                    phase="projects",
+                    cursor="",
+                    passes=str(int(self.state.get("passes", "0")) + 1),
+                    last_pass_completed_at=datetime.utcnow().isoformat()
+                )
+                finished_pass = True
+            else:
+                self.state["cursor"] = names[-1]
+
+        await db.save_reconciler_state(self.state)
+        return finished_pass
+
+    def _list_directories_after(self, cursor: str, limit: int) -> List[str]:
+        if not self.projects_dir.is_dir():
+            return []
+        with os.scandir(self.projects_dir) as entries:
+            names = sorted(
+                entry.name for entry in entries
+                if entry.is_dir(follow_symlinks=False)
+                and not entry.name.startswith(".")
+                and entry.name > cursor
+            )
+        return names[:limit]
+
+    def _scan_project(self, project_id: str) -> Optional[Dict[str, Tuple[int, float]]]:
+        """Map each file under a project directory to its (size, mtime); None if the directory is missing."""
+        found: Dict[str, Tuple[int, float]] = {}
+        root = self.projects_dir / project_id
+        if not root.is_dir():
+            return None
+
+        stack = [root]
+        while stack:
+            directory = stack.pop()
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(Path(entry.path))
+                    elif entry.is_file(follow_symlinks=False):
+                        stat = entry.stat(follow_symlinks=False)
+                        relative = Path(entry.path).relative_to(root).as_posix()
+                        found[relative] = (stat.st_size, stat.st_mtime)
+        return found
+
+    # Repairs
+
+    async def _check_project(self, project_id: str):
+        db = get_db()
+        # Hold the cold storage lock so archival cannot remove files mid-scan
+        async with get_cold_storage().lock(project_id):
+            project = await db.get_project_by_id(project_id)
+            if not project or project["archived"]:
+                self._missing_since.pop(project_id, None)
+                return
+
+            recorded = {f["filename"]: f["size"] for f in await db.list_files(project_id)}
+            on_disk = await asyncio.to_thread(self._scan_project, project_id)
+            now = time.time()
+            settled_before = now - self.grace_seconds
+
+            if on_disk is None:
+                # More likely an unmounted or misconfigured data directory than lost files;
+                # report it once per pass and leave the rows alone
+                self._missing_since.pop(project_id, None)
+                if recorded:
+                    await self._report(MISSING_DIRECTORY, project_id, None,
+                                       f"Project directory is missing; {len(recorded)} file rows kept")
+                return
+
+            # A missing file is only acted on when it was already missing a grace period ago
+            previously_missing = self._missing_since.pop(project_id, {})
+            missing_since = {
+                filename: previously_missing.get(filename, now)
+                for filename in recorded if filename not in on_disk
+            }
+
+            for filename, size in recorded.items():
+                if filename in missing_since:
+                    if missing_since[filename] >= settled_before:
+                        continue
+                    if self.repair:
+                        await db.delete_file(project_id, filename)
+                        del missing_since[filename]
+                    await self._report(MISSING_FILE, project_id, filename,
+                                       "File row has no file on disk")
+                elif on_disk[filename][0] != size and on_disk[filename][1] < settled_before:
+                    actual = on_disk[filename][0]
+                    if self.repair:
+                        await db.update_file_size(project_id, filename, actual)
+                    await self._report(SIZE_MISMATCH, project_id, filename,
+                                       f"Recorded {size} bytes, found {actual} bytes")
+
+            if missing_since:
+                self._missing_since[project_id] = missing_since
+
+            for filename, (size, mtime) in on_disk.items():
+                # Recent files may belong to an upload that has not recorded them yet
+                if filename not in recorded and mtime < settled_before:
+                    if self.repair:
+                        await db.add_file(project_id, filename, size)
+                    await self._report(UNTRACKED_FILE, project_id, filename,
+                                       f"File on disk ({size} bytes) has no file row")
+
+    async def _handle_orphan_directory(self, name: str):
+        directory = self.projects_dir / name
+        try:
+            mtime = directory.stat().st_mtime
+        except FileNotFoundError:
+            return
+        if mtime >= time.time() - self.grace_seconds:
+            return
+
+        if self.repair:
+            await asyncio.to_thread(shutil.rmtree, directory, True)
+        await self._report(ORPHAN_DIRECTORY, name, None, "Directory has no project row")
+
+    async def _report(self, kind: str, project_id: str, filename: Optional[str], detail: str):
+        logger.warning("Reconciler found %s in %s: %s (%s)", kind, project_id, filename or "-", detail)
+        await get_db().add_reconciler_finding(kind, project_id, filename, detail, self.repair)
+
+    # Reporting
+
+    async def status(self, limit: int = 100) -> Dict:
+        """Get reconciler progress and the most recent findings."""
+        return {
+            "enabled": self._task is not None,
+            "repair": self.repair,
+            "phase": self.state.get("phase", "projects"),
+            "cursor": self.state.get("cursor", ""),
+            "passes": int(self.state.get("passes", "0")),
+            "pass_started_at": self.state.get("pass_started_at"),
+            "last_pass_completed_at": self.state.get("last_pass_completed_at"),
+            "findings": await get_db().list_reconciler_findings(limit),
+        }
+
+
+# Global reconciler instance
+reconciler: Optional[Reconciler] = None
+
+
+def get_reconciler() -> Reconciler:
+    """Get the global reconciler instance."""
+    if reconciler is None:
+        raise RuntimeError("Reconciler not initialized. Call init_reconciler() first.")
+    return reconciler
+
+
+async def init_reconciler(projects_dir: str, batch_size: int, interval: float, pass_interval: float,
+                          repair: bool, grace_seconds: float, enabled: bool = True):
+    """Initialize the global reconciler and start it if enabled."""
+    global reconciler
+    reconciler = Reconciler(projects_dir, batch_size, interval, pass_interval, repair, grace_seconds)
+    if enabled:
+        reconciler.start()
+
+
+async def close_reconciler():
+    """Stop the global reconciler."""
+    global reconciler
+    if reconciler:
+        await reconciler.stop()
+        reconciler = None
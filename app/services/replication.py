@@ -0,0 +1,333 @@
+"""Read-only replica mode: follow a primary's change log and mirror its projects."""
+
+import asyncio
+import json
+import logging
+import os
+import shutil
+import urllib.error
+import urllib.parse
+import urllib.request
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.database import Database, get_db
+from app.services.cold_storage import get_cold_storage, open_from_archive
+from app.utils.file_validation import validate_filename, ValidationError
+
+
+logger = logging.getLogger(__name__)
+
+
+class HttpSource:
+    """Reads changes and file contents from a primary over its replication API."""
+
+    def __init__(self, base_url: str, timeout: float = 30.0):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def _get_json(self, path: str) -> Dict[str, Any]:
+        with urllib.request.urlopen(f"{self.base_url}{path}", timeout=self.timeout) as response:
+            return json.loads(response.read())
+
+    async def changes(self, after: int, limit: int) -> Dict[str, Any]:
+        """Fetch change log entries after a sequence number."""
+        return await asyncio.to_thread(
+            self._get_json, f"/api/replication/changes?after={after}&limit={limit}"
+        )
+
+    async def snapshot(self) -> Dict[str, Any]:
+        """Fetch all replicated metadata."""
+        return await asyncio.to_thread(self._get_json, "/api/replication/snapshot")
+
+    async def download(self, project_id: str, filename: str, target: Path) -> bool:
+        """Download a file to `target`; returns False if the primary no longer has it."""
+        return await asyncio.to_thread(self._download, project_id, filename, target)
+
+    def _download(self, project_id: str, filename: str, target: Path) -> bool:
+        url = (
+            f"{self.base_url}/api/replication/files/"
+            f"{urllib.parse.quote(project_id)}/{urllib.parse.quote(filename)}"
+        )
+        try:
+            with urllib.request.urlopen(url, timeout=self.timeout) as response, open(target, "wb") as f:
+                shutil.copyfileobj(response, f, 1024 * 1024)
+        except urllib.error.HTTPError as e:
+            if e.code == 404:
+                return False
+            raise
+        return True
+
+
+class LocalSource:
+    """Reads directly from another framebox data directory on this machine (useful for tests)."""
+
+    def __init__(self, data_dir: str):
+        self.data_dir = Path(data_dir)
+        self.db = Database(str(self.data_dir / "framebox.db"))
+
+    async def changes(self, after: int, limit: int) -> Dict[str, Any]:
+        """Fetch change log entries after a sequence number."""
+        bounds = await self.db.get_change_log_bounds()
+        return {**bounds, "changes": await self.db.get_changes(after, limit)}
+
+    async def snapshot(self) -> Dict[str, Any]:
+        """Fetch all replicated metadata."""
+        return await self.db.get_replication_snapshot()
+
+    async def download(self, project_id: str, filename: str, target: Path) -> bool:
+        """Copy a file to `target`; returns False if the primary no longer has it."""
+        return await asyncio.to_thread(self._copy, project_id, filename, target)
+
+    def _copy(self, project_id: str, filename: str, target: Path) -> bool:
+        source = self.data_dir / "projects" / project_id / filename
+        try:
+            shutil.copyfile(source, target)
+            return True
+        except FileNotFoundError:
+            member = open_from_archive(self.data_dir / "archive" / f"{project_id}.zip", filename)
+            if member is None:
+                return False
+            with member[0] as stream, open(target, "wb") as f:
+                shutil.copyfileobj(stream, f, 1024 * 1024)
+            return True
+
+    async def close(self):
+        """Close the primary database connection."""
+        await self.db.close()
+
+
+def make_source(primary: str):
+    """Create a change source from an http(s) URL or a local data directory path."""
+    if primary.startswith(("http://", "https://")):
+        return HttpSource(primary)
+    return LocalSource(primary.removeprefix("file://"))
+
+
+class Replica:
+    """
+    Applies a primary's ordered change log to the local database and project files.
+
+    A fresh replica (or one that fell behind the primary's retained log) first
+    copies a full metadata snapshot, then follows the log incrementally. The
+    applied sequence number is persisted after every change, and applying a
+    change twice is harmless, so restarts resume without gaps.
+    """
+
+    def __init__(self, source, primary: str, projects_dir: str, poll_interval: float, batch_size: int):
+        self.source = source
+        self.primary = primary
+        self.projects_dir = Path(projects_dir)
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.applied_seq: Optional[int] = None
+        self.primary_last_seq: Optional[int] = None
+        self.behind_since: Optional[str] = None
+        self.last_sync_at: Optional[str] = None
+        self.last_error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    # Lifecycle
+
+    def start(self):
+        """Start following the primary."""
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop following the primary."""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if hasattr(self.source, "close"):
+            await self.source.close()
+
+    async def _run(self):
+        while True:
+            try:
+                await self.sync_once()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                logger.exception("Replication from %s failed", self.primary)
+            await asyncio.sleep(self.poll_interval)
+
+    # Synchronization
+
+    async def sync_once(self):
+        """Apply all changes currently available on the primary."""
+        db = get_db()
+        if self.applied_seq is None:
+            state = await db.get_replica_state()
+            if "applied_seq" in state and state.get("primary") == self.primary:
+                self.applied_seq = int(state["applied_seq"])
+            else:
+                await self.resync()
+
+        while True:
+            batch = await self.source.changes(self.applied_seq, self.batch_size)
+            self.primary_last_seq = batch["last_seq"]
+
+            if batch["oldest_seq"] > self.applied_seq + 1:
+                # Entries we still need were pruned from the primary's log
+                await self.resync()
+                continue
+
+            changes: List[Dict[str, Any]] = batch["changes"]
+            self.behind_since = changes[0]["created_at"] if changes else None
+            for change in changes:
+                await self._apply(change)
+                self.applied_seq = change["seq"]
+                await self._save_state()
+
+            if len(changes) < self.batch_size:
+                break
+
+        self.behind_since = None
+        self.last_sync_at = datetime.utcnow().isoformat()
+
+    async def resync(self):
+        """Replace local state with a full snapshot from the primary."""
+        db = get_db()
+        snapshot = await self.source.snapshot()
+        logger.info("Resynchronizing from %s at change %s", self.primary, snapshot["last_seq"])
+
+        remote_projects = {p["id"]: p for p in snapshot["projects"]}
+        local_projects = {p["id"]: p for p in await db.list_projects()}
+
+        for project_id in local_projects.keys() - remote_projects.keys():
+            await self._delete_project(project_id)
+
+        # Swapped names cannot collide: the upsert parks a project holding an incoming name
+        for project in remote_projects.values():
+            await db.upsert_replicated_project(project)
+
+        remote_files = {(f["project_id"], f["filename"]): f for f in snapshot["files"]}
+        local_files = {(f["project_id"], f["filename"]): f for f in await db.list_all_files()}
+
+        for project_id, filename in local_files.keys() - remote_files.keys():
+            await self._delete_file(project_id, filename)
+
+        for key, remote in remote_files.items():
+            local = local_files.get(key)
+            if local is None or (local["size"], local["uploaded_at"]) != (remote["size"], remote["uploaded_at"]):
+                await self._copy_file(remote["project_id"], remote["filename"], remote["uploaded_at"])
+
+        self.applied_seq = snapshot["last_seq"]
+        await self._save_state()
+
+    async def _save_state(self):
+        await get_db().save_replica_state({
+            "primary": self.primary,
+            "applied_seq": str(self.applied_seq),
+        })
+
+    # Applying changes
+
+    async def _apply(self, change: Dict[str, Any]):
+        kind = change["kind"]
+        project_id = change["project_id"]
+
+        if kind == "project_upsert":
+            await get_db().upsert_replicated_project({"id": project_id, **change["payload"]})
+        elif kind == "project_delete":
+            await self._delete_project(project_id)
+        elif kind == "file_upsert":
+            await self._copy_file(project_id, change["filename"], change["payload"]["uploaded_at"])
+        elif kind == "file_delete":
+            await self._delete_file(project_id, change["filename"])
+        else:
+            logger.warning("Ignoring unknown change kind %r (seq %s)", kind, change["seq"])
+
+    async def _hydrated_project(self, project_id: str) -> Optional[Dict[str, Any]]:
+        """Get a local project, expanding it from cold storage before its files are changed."""
+        project = await get_db().get_project_by_id(project_id)
+        if project:
+            cold_storage = get_cold_storage()
+            cold_storage.tracker.touch(project_id)
+            await cold_storage.ensure_hydrated(project)
+        return project
+
+    def _local_path(self, project_id: str, filename: str) -> Optional[Path]:
+        try:
+            return self.projects_dir / project_id / validate_filename(filename)
+        except ValidationError:
+            logger.warning("Skipping unsafe replicated filename %r in %s", filename, project_id)
+            return None
+
+    async def _copy_file(self, project_id: str, filename: str, uploaded_at: str):
+        target = self._local_path(project_id, filename)
+        if target is None or not await self._hydrated_project(project_id):
+            return
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        partial = target.with_name(f".{target.name}.replica")
+        try:
+            if not await self.source.download(project_id, filename, partial):
+                return  # Deleted on the primary since; a later change removes it here
+            os.replace(partial, target)
+        finally:
+            partial.unlink(missing_ok=True)
+
+        # The primary may already hold newer content; record what we actually copied
+        size = target.stat().st_size
+        await get_db().upsert_replicated_file(project_id, filename, size, uploaded_at)
+
+    async def _delete_file(self, project_id: str, filename: str):
+        await get_db().delete_file(project_id, filename)
+        target = self._local_path(project_id, filename)
+        if target is not None and await self._hydrated_project(project_id):
+            target.unlink(missing_ok=True)
+
+    async def _delete_project(self, project_id: str):
+        await get_db().delete_project(project_id)
+        await asyncio.to_thread(shutil.rmtree, self.projects_dir / project_id, True)
+        get_cold_storage().discard(project_id)
+
+    # Reporting
+
+    def status(self) -> Dict[str, Any]:
+        """Get replication progress and lag."""
+        lag_changes = None
+        if self.primary_last_seq is not None and self.applied_seq is not None:
+            lag_changes = max(self.primary_last_seq - self.applied_seq, 0)
+
+        lag_seconds = 0.0
+        if self.behind_since:
+            lag_seconds = (datetime.utcnow() - datetime.fromisoformat(self.behind_since)).total_seconds()
+
+        return {
+            "role": "replica",
+            "primary": self.primary,
+            "applied_seq": self.applied_seq,
+            "primary_last_seq": self.primary_last_seq,
+            "lag_changes": lag_changes,
+            "lag_seconds": max(lag_seconds, 0.0),
+            "last_sync_at": self.last_sync_at,
+            "last_error": self.last_error,
+        }
+
+
+# Global replica instance (None on a primary)
+replica: Optional[Replica] = None
+
+
+def get_replica() -> Optional[Replica]:
+    """Get the global replica instance, or None when running as a primary."""
+    return replica
+
+
+async def init_replica(primary: str, projects_dir: str, poll_interval: float, batch_size: int):
+    """Start following a primary."""
+    global replica
+    replica = Replica(make_source(primary), primary, projects_dir, poll_interval, batch_size)
+    replica.start()
+
+
+async def close_replica():
+    """Stop following the primary."""
+    global replica
+    if replica:
+        await replica.stop()
+        replica = None
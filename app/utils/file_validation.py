@@ -77,6 +77,23 @@ def validate_total_size(total_size: int, max_size: int = MAX_UPLOAD_SIZE) -> Non
         raise ValidationError(f"Total upload size {total_size} bytes exceeds maximum {max_size} bytes")
 
 
+def validate_project_quota(projected_bytes: int, quota_bytes: int) -> None:
+    """
+    Validate project storage usage after an upload against its quota.
+
+    Args:
+        projected_bytes: Total project size in bytes once the upload is applied
+        quota_bytes: Maximum allowed project size in bytes (0 for unlimited)
+
+    Raises:
+        ValidationError: If projected usage exceeds the quota
+    """
+    if quota_bytes > 0 and projected_bytes > quota_bytes:
+        raise ValidationError(
+            f"Project storage {projected_bytes} bytes exceeds maximum {quota_bytes} bytes"
+        )
+
+
 def sanitize_filename(filename: str) -> str:
     """
     Sanitize filename by removing dangerous patterns.
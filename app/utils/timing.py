@@ -0,0 +1,48 @@
+"""Per-request timing breakdown shared between middleware and the data layer."""
+
+import functools
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+
+class RequestTimings:
+    """Mutable timing and attribution data collected while handling one request."""
+
+    __slots__ = ("db_time", "project_id", "cache")
+
+    def __init__(self):
+        self.db_time = 0.0
+        self.project_id: Optional[str] = None
+        self.cache: Optional[str] = None
+
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+def start_request_timings() -> RequestTimings:
+    """Begin collecting timings for the current request context."""
+    timings = RequestTimings()
+    _current.set(timings)
+    return timings
+
+
+def current_timings() -> Optional[RequestTimings]:
+    """Get the timings of the request being handled, if any are being collected."""
+    return _current.get()
+
+
+def db_timed(func):
+    """Decorator adding an async database method's duration to the current request."""
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        timings = _current.get()
+        if timings is None:
+            return await func(*args, **kwargs)
+
+        started = time.perf_counter()
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            timings.db_time += time.perf_counter() - started
+    return wrapper
@@ -0,0 +1,193 @@
+"""Fingerprinted, precompressed web UI assets."""
+
+import gzip
+import hashlib
+import os
+import posixpath
+import re
+import shutil
+from pathlib import Path
+from typing import Dict, Optional, Set, Tuple
+
+from starlette.datastructures import Headers
+from starlette.staticfiles import StaticFiles
+
+try:
+    import brotli
+except ImportError:  # Optional; only gzip variants are built without it
+    brotli = None
+
+
+# Files smaller than this are not worth compressing
+MIN_COMPRESS_SIZE = 256
+
+COMPRESSIBLE_SUFFIXES = {".html", ".css", ".js", ".json", ".svg", ".txt", ".map"}
+
+# Fingerprinted files never change, so browsers may cache them for a year without revalidating
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+# src/href attributes holding a plain local path
+REFERENCE_PATTERN = re.compile(r'\b(src|href)=(["\'])(/?[\w./-]+)\2')
+
+# Precompressed variants in order of preference
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+class UIStaticFiles(StaticFiles):
+    """
+    Serves the web UI from a build of the static directory.
+
+    `build()` copies the source directory, adds a content-hashed copy of every
+    asset (app.js -> app.3f2a9c1b7e.js), rewrites references in HTML files to
+    the hashed names and writes gzip (and, when available, brotli) variants.
+    Hashed copies are served as immutable; everything else, including
+    index.html, must be revalidated, so a new build is picked up on the next
+    page load.
+    """
+
+    def __init__(self, source_dir: str, build_dir: str):
+        super().__init__(directory=build_dir, html=True, check_dir=False)
+        self.source_dir = Path(source_dir)
+        self.build_dir = Path(build_dir)
+        self.fingerprinted: Set[str] = set()
+        self.compressed: Set[str] = set()
+
+    # Build
+
+    def build(self) -> Dict[str, str]:
+        """
+        Rebuild the served directory from the source directory (blocking).
+
+        Returns:
+            Mapping of asset paths to their fingerprinted paths
+        """
+        partial = self.build_dir.with_name(f".{self.build_dir.name}.partial")
+        shutil.rmtree(partial, ignore_errors=True)
+        shutil.copytree(self.source_dir, partial)
+
+        files = sorted(p for p in partial.rglob("*") if p.is_file())
+        fingerprints: Dict[str, str] = {}
+        for path in files:
+            if path.suffix == ".html":
+                continue
+            relative = path.relative_to(partial)
+            digest = hashlib.sha256(path.read_bytes()).hexdigest()[:10]
+            hashed = relative.with_name(f"{relative.stem}.{digest}{relative.suffix}")
+            shutil.copyfile(path, partial / hashed)
+            fingerprints[relative.as_posix()] = hashed.as_posix()
+
+        for path in files:
+            if path.suffix == ".html":
+                self._rewrite_references(path, partial, fingerprints)
+
+        compressed = set()
+        for path in sorted(p for p in partial.rglob("*") if p.is_file()):
+            if self._compress(path):
+                compressed.add(path.relative_to(partial).as_posix())
+
+        shutil.rmtree(self.build_dir, ignore_errors=True)
+        os.replace(partial, self.build_dir)
+
+        self.fingerprinted = set(fingerprints.values())
+        self.compressed = compressed
+        return fingerprints
+
+    @staticmethod
+    def _rewrite_references(path: Path, root: Path, fingerprints: Dict[str, str]):
+        """Point local src/href attributes of an HTML file at fingerprinted copies."""
+        page_dir = path.parent.relative_to(root).as_posix()
+
+        def replace(match: re.Match) -> str:
+            attr, quote, url = match.groups()
+            # Root-relative URLs resolve against the UI root, others against the page
+            target = url[1:] if url.startswith("/") else posixpath.join(page_dir, url)
+            hashed = fingerprints.get(posixpath.normpath(target))
+            if hashed is None:
+                return match.group(0)
+            if url.startswith("/"):
+                new_url = f"/{hashed}"
+            else:
+                new_url = posixpath.relpath(hashed, page_dir)
+            return f"{attr}={quote}{new_url}{quote}"
+
+        # Plain paths only; absolute URLs, query strings and fragments are left alone
+        html = REFERENCE_PATTERN.sub(replace, path.read_text(encoding="utf-8"))
+        path.write_text(html, encoding="utf-8")
+
+    @staticmethod
+    def _compress(path: Path) -> bool:
+        """Write precompressed variants next to a file; returns whether any were written."""
+        if path.suffix not in COMPRESSIBLE_SUFFIXES:
+            return False
+        data = path.read_bytes()
+        if len(data) < MIN_COMPRESS_SIZE:
+            return False
+
+        # mtime=0 keeps the output (and its ETag) identical across builds
+        path.with_name(path.name + ".gz").write_bytes(gzip.compress(data, compresslevel=9, mtime=0))
+        if brotli is not None:
+            path.with_name(path.name + ".br").write_bytes(brotli.compress(data, quality=11))
+        return True
+
+    # Serving
+
+    async def get_response(self, path: str, scope):
+        """Serve a precompressed variant when the client accepts one, with caching headers."""
+        relative = path
+        full_path, _ = self.lookup_path(path)
+        if full_path is not None and os.path.isdir(full_path):
+            relative = os.path.join(path, "index.html")
+        relative = posixpath.normpath(relative.replace(os.sep, "/")).lstrip("/")
+
+        encoding = self._accepted_encoding(relative, scope)
+        if encoding is not None:
+            # The variant's media type is guessed from the name before its suffix (app.js.gz)
+            name, suffix = encoding
+            response = await super().get_response(relative + suffix, scope)
+            response.headers["content-encoding"] = name
+        else:
+            response = await super().get_response(path, scope)
+
+        if response.status_code in (200, 304):
+            if relative in self.compressed:
+                response.headers["vary"] = "Accept-Encoding"
+            response.headers["cache-control"] = (
+                IMMUTABLE_CACHE_CONTROL if relative in self.fingerprinted else REVALIDATE_CACHE_CONTROL
+            )
+        return response
+
+    def _accepted_encoding(self, relative: str, scope) -> Optional[Tuple[str, str]]:
+        """Pick the precompressed variant the client weights highest, preferring brotli on ties."""
+        if relative not in self.compressed:
+            return None
+        qualities = self._parse_accept_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        best = None
+        for name, suffix in ENCODINGS:
+            # An encoding not listed falls back to the "*" wildcard; q=0 means "not acceptable"
+            quality = qualities.get(name, qualities.get("*", 0.0))
+            if quality <= 0 or (best is not None and quality <= best[0]):
+                continue  # Ties go to the earlier, preferred encoding
+            if (self.build_dir / (relative + suffix)).is_file():
+                best = (quality, name, suffix)
+        return best[1:] if best else None
+
+    @staticmethod
+    def _parse_accept_encoding(header: str) -> Dict[str, float]:
+        """Map each coding in an Accept-Encoding header to its q-value (1 when omitted)."""
+        qualities: Dict[str, float] = {}
+        for token in header.split(","):
+            name, *params = token.split(";")
+            name = name.strip().lower()
+            if not name:
+                continue
+            quality = 1.0
+            for param in params:
+                key, _, value = param.partition("=")
+                if key.strip().lower() == "q":
+                    try:
+                        quality = float(value)
+                    except ValueError:
+                        quality = 0.0  # A malformed weight is not taken as acceptance
+            qualities[name] = quality
+        return qualities
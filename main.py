@@ -1,31 +1,88 @@
 """Main application entry point for framebox."""
 
+import argparse
+import asyncio
+import logging
+import os
 import time
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 import uvicorn
 
 from app.config import settings
-from app.database import init_database, close_database
-from app.api import projects, files, static
-from app.models import HealthResponse, ServerInfoResponse
+from app.database import init_database, close_database, get_db
+from app.services.backup import BackupManager, init_backup_manager, close_backup_manager
+from app.services.cold_storage import init_cold_storage, close_cold_storage
+from app.services.importer import Importer
+from app.services.jobs import init_job_queue, close_job_queue
+from app.services.processing import PROCESS_PROJECT, process_project
+from app.services.reconciler import init_reconciler, close_reconciler
+from app.services.replication import init_replica, close_replica
+from app.api import projects, files, static, maintenance, replication, jobs
+from app.middleware.access_log import AccessLogMiddleware, AccessLogWriter
+from app.middleware.admission import AdmissionController, AdmissionMiddleware
+from app.middleware.profiling import ProfileStore, ProfilingMiddleware
+from app.middleware.read_only import ReadOnlyMiddleware
+from app.models import HealthResponse, ServerInfoResponse, MetricsResponse, StatsResponse
 from app.utils.network import get_local_ip
+from app.utils.ui_assets import UIStaticFiles
 
 
 # Track application start time for uptime
 start_time = time.time()
 
+# Buffered access log writer, started and flushed by the lifespan
+access_log = AccessLogWriter.from_settings(settings) if settings.access_log_enabled else None
+
+# Web UI served from a fingerprinted, precompressed build of static/ made at startup
+ui = UIStaticFiles("static", settings.ui_dir)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager."""
     # Startup
+    await asyncio.to_thread(ui.build)
     await init_database(settings.db_path)
+    await init_cold_storage(
+        settings.projects_dir,
+        settings.archive_dir,
+        idle_days=settings.archive_idle_days,
+        check_interval=settings.archive_check_interval,
+        flush_interval=settings.access_flush_interval
+    )
+    await init_reconciler(
+        settings.projects_dir,
+        batch_size=settings.reconcile_batch_size,
+        interval=settings.reconcile_interval,
+        pass_interval=settings.reconcile_pass_interval,
+        # Replicas only report drift; repairs would diverge from the primary
+        repair=settings.reconcile_repair and not settings.replica_of,
+        grace_seconds=settings.reconcile_grace_seconds,
+        enabled=settings.reconcile_enabled
+    )
+    await init_backup_manager(settings)
+    await init_job_queue(settings, {PROCESS_PROJECT: process_project})
+    if settings.replica_of:
+        await init_replica(
+            settings.replica_of,
+            settings.projects_dir,
+            poll_interval=settings.replica_poll_interval,
+            batch_size=settings.replica_batch_size
+        )
+    if access_log:
+        access_log.start()
     yield
     # Shutdown
+    if access_log:
+        await access_log.stop()
+    await close_replica()
+    await close_job_queue()
+    await close_backup_manager()
+    await close_reconciler()
+    await close_cold_storage()
     await close_database()
 
 
@@ -38,6 +95,26 @@ app = FastAPI(
 )
 
 
+# Reject writes when running as a read-only replica (checked per request; set by `serve --replica-of`)
+app.add_middleware(ReadOnlyMiddleware, settings=settings)
+
+
+# Admission control for uploads and management API (inside CORS so 503s keep CORS headers)
+admission = AdmissionController.from_settings(settings)
+app.add_middleware(AdmissionMiddleware, controller=admission)
+
+
+# Per-request profiling, only installed when enabled so it costs nothing otherwise
+if settings.admin_token or settings.profile_sample_rate > 0:
+    app.add_middleware(
+        ProfilingMiddleware,
+        store=ProfileStore(settings.profiles_dir, settings.profile_keep_slowest),
+        admin_token=settings.admin_token,
+        sample_rate=settings.profile_sample_rate,
+        interval=settings.profile_interval
+    )
+
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -48,6 +125,15 @@ app.add_middleware(
 )
 
 
+# Structured access log (outermost so it sees rejected and failed requests too)
+if access_log:
+    app.add_middleware(
+        AccessLogMiddleware,
+        writer=access_log,
+        view_sample_rate=settings.access_log_view_sample_rate
+    )
+
+
 # Health check endpoint (before routers to ensure it's accessible)
 @app.get("/api/health", response_model=HealthResponse)
 async def health_check():
@@ -77,18 +163,40 @@ async def server_info():
     )
 
 
+# Storage usage endpoint
+@app.get("/api/stats", response_model=StatsResponse)
+async def stats():
+    """Get instance-wide storage usage (constant time, maintained by database triggers)."""
+    return StatsResponse(**await get_db().get_storage_stats())
+
+
+# Runtime metrics endpoint
+@app.get("/api/metrics", response_model=MetricsResponse)
+async def metrics():
+    """Get runtime metrics such as admission queue depth."""
+    return MetricsResponse(
+        admission=admission.metrics(),
+        access_log_dropped=access_log.dropped if access_log else 0
+    )
+
+
 # Register API routers
 app.include_router(projects.router)
 app.include_router(files.router)
 app.include_router(static.router)
+app.include_router(maintenance.router)
+app.include_router(replication.router)
+app.include_router(jobs.router)
 
 
 # Mount static files for web UI (must be last to not override API routes)
-app.mount("/", StaticFiles(directory="static", html=True), name="static")
+app.mount("/", ui, name="static")
 
 
-def main():
-    """Run the application."""
+def serve(args: argparse.Namespace):
+    """Run the web server."""
+    if getattr(args, "replica_of", None):
+        settings.replica_of = args.replica_of
     uvicorn.run(
         "main:app",
         host=settings.host,
@@ -97,5 +205,60 @@ def main():
     )
 
 
+def backup(args: argparse.Namespace):
+    """Create an incremental snapshot of the database and project files."""
+    manager = BackupManager.from_settings(settings)
+    snapshot = manager.create_snapshot()
+    print(
+        f"Snapshot {snapshot['name']} written to {manager.backups_dir / snapshot['name']}: "
+        f"{snapshot['files_copied']} copied ({snapshot['bytes_copied']} bytes), "
+        f"{snapshot['files_linked']} hard-linked, {snapshot['missing']} missing"
+    )
+
+
+def import_projects(args: argparse.Namespace):
+    """Import a directory tree with one subdirectory per project."""
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s: %(message)s")
+    importer = Importer.from_settings(
+        settings,
+        link=args.link,
+        workers=args.workers,
+        batch_size=args.batch_size
+    )
+    stats = importer.run(args.source)
+    print(
+        f"Imported {stats['files_imported']} files ({stats['bytes_imported']} bytes) in "
+        f"{stats['elapsed']:.1f}s, {stats['files_per_second']} files/s: "
+        f"{stats['projects_created']} projects created, {stats['projects_resumed']} resumed, "
+        f"{stats['projects_skipped']} skipped; {stats['files_skipped']} files skipped, "
+        f"{stats['files_failed']} failed"
+    )
+    if stats["files_failed"]:
+        raise SystemExit(1)
+
+
+def main():
+    """Run the application or one of its maintenance commands."""
+    parser = argparse.ArgumentParser(prog="framebox", description=app.description)
+    subparsers = parser.add_subparsers(dest="command")
+    serve_parser = subparsers.add_parser("serve", help="Run the web server (default)")
+    serve_parser.add_argument("--replica-of", metavar="PRIMARY",
+                              help="Run as a read-only replica of a primary URL or local data directory")
+    serve_parser.set_defaults(func=serve)
+    subparsers.add_parser("backup", help="Create an incremental backup snapshot").set_defaults(func=backup)
+    import_parser = subparsers.add_parser("import", help="Import a directory of project directories")
+    import_parser.add_argument("source", help="Directory with one subdirectory per project")
+    import_parser.add_argument("--link", action="store_true",
+                               help="Hard-link files instead of copying them (same filesystem only)")
+    import_parser.add_argument("--workers", type=int, default=min(32, (os.cpu_count() or 1) * 4),
+                               help="Threads copying files")
+    import_parser.add_argument("--batch-size", type=int, default=5000,
+                               help="File rows written per transaction")
+    import_parser.set_defaults(func=import_projects)
+
+    args = parser.parse_args()
+    getattr(args, "func", serve)(args)
+
+
 if __name__ == "__main__":
     main()
@@ -6,6 +6,13 @@
 set -e
 
 API_BASE="${API_BASE:-http://localhost:8000}"
+ADMIN_TOKEN="${ADMIN_TOKEN:-}"  # Set to the server's ADMIN_TOKEN to test on-demand profiling
+DATA_DIR="${DATA_DIR:-./data}"  # The server's DATA_DIR, for checks that read its files
+# Interpreter with the project's dependencies for the local maintenance commands (uv's .venv by default)
+if [ -z "$PYTHON" ]; then
+    if [ -x .venv/bin/python ]; then PYTHON=.venv/bin/python; else PYTHON=python; fi
+fi
+REPLICA_PORT="${REPLICA_PORT:-8001}"  # Free port for a temporary replica of the server
 PROJECT_NAME="test-project-$(date +%s)"
 PROJECT_ID=""
 
@@ -208,7 +215,257 @@ else
     exit 1
 fi
 
+# 19. Test metrics endpoint
+echo ""
+echo "19. Testing metrics endpoint..."
+curl -s "$API_BASE/api/metrics" | grep -q '"uploads"'
+test_result "Admission queue metrics"
+
+# 20. Test storage stats endpoint
+echo ""
+echo "20. Testing storage stats endpoint..."
+curl -s "$API_BASE/api/stats" | grep -q '"total_bytes"'
+test_result "Instance storage stats"
+
+# 21. Test reconciler status endpoint
+echo ""
+echo "21. Testing reconciler status endpoint..."
+curl -s "$API_BASE/api/maintenance/reconciler" | grep -q '"phase"'
+test_result "Reconciler status"
+
+# 22. Test replication change log
+echo ""
+echo "22. Testing replication change log..."
+curl -s "$API_BASE/api/replication/changes?after=0&limit=10" | grep -q '"last_seq"'
+test_result "Replication change log"
+
+# 23. Test job queue status endpoint
+echo ""
+echo "23. Testing job queue status endpoint..."
+curl -s "$API_BASE/api/jobs" | grep -q '"workers"'
+test_result "Job queue status"
+
+# 24. Test fingerprinted UI assets are cached as immutable
+echo ""
+echo "24. Testing fingerprinted UI assets..."
+ASSET=$(curl -s "$API_BASE/" | grep -o 'src="/app\.[0-9a-f]*\.js"' | cut -d'"' -f2)
+curl -sI "$API_BASE$ASSET" | grep -qi 'cache-control: .*immutable'
+test_result "Immutable UI asset caching"
+
+# 25. Test NDJSON catalog export
+echo ""
+echo "25. Testing NDJSON catalog export..."
+curl -s -o /dev/null -w "%{content_type}" "$API_BASE/api/maintenance/export" | grep -q 'application/x-ndjson'
+test_result "NDJSON catalog export"
+
+# 26. Test cold storage archive and rehydrate
+echo ""
+echo "26. Testing cold storage archive and rehydrate..."
+EXTRA_ID=$(curl -s -X POST "$API_BASE/api/projects" \
+    -H "Content-Type: application/json" \
+    -d "{\"name\": \"$PROJECT_NAME-extra\"}" | grep -o '"id":"[^"]*"' | cut -d'"' -f4)
+curl -s -X POST "$API_BASE/api/projects/$EXTRA_ID/files" \
+    -F "files=@/tmp/iframe-test/index.html" > /dev/null
+curl -s -X POST "$API_BASE/api/maintenance/archive/$EXTRA_ID" | grep -q '"archived":true'
+curl -s "$API_BASE/api/replication/files/$EXTRA_ID/index.html" | grep -q "Test Project"
+curl -s "$API_BASE/view/$EXTRA_ID/" | grep -q "Test Project"
+curl -s "$API_BASE/api/projects/$EXTRA_ID" | grep -q '"archived":false'
+test_result "Archive and rehydrate on access"
+
+# 27. Test on-demand profiling is requested by header only
+echo ""
+echo "27. Testing on-demand profiling..."
+if curl -sI "$API_BASE/view/$EXTRA_ID/?__profile=$ADMIN_TOKEN" | grep -qi '^x-profile-file'; then
+    false
+fi
+if [ -n "$ADMIN_TOKEN" ]; then
+    curl -sI -H "X-Framebox-Profile: $ADMIN_TOKEN" "$API_BASE/view/$EXTRA_ID/" | grep -qi '^x-profile-file'
+else
+    echo "   ADMIN_TOKEN not set; only checked that the query parameter is ignored"
+fi
+test_result "Profiling via X-Framebox-Profile header"
+
+# 28. Test access log records route and timings without changing responses
+echo ""
+echo "28. Testing access log..."
+curl -s -D /tmp/iframe-test/health.headers "$API_BASE/api/health" | grep -q '"status":"ok"'
+grep -qi '^content-length:' /tmp/iframe-test/health.headers
+sleep 2  # Records are written by a background flush
+if [ -f "$DATA_DIR/logs/access.log" ]; then
+    grep '"path":"/api/health"' "$DATA_DIR/logs/access.log" | tail -1 \
+        | grep '"route":"/api/health"' | grep '"db_ms":' | grep -q '"handler_ms":'
+else
+    echo "   $DATA_DIR/logs/access.log not found; only checked the response"
+fi
+test_result "Access log with route and timings"
+
+# 29. Test a project quota can be reset to the instance default
+echo ""
+echo "29. Testing project quota reset..."
+curl -s -X PUT "$API_BASE/api/projects/$EXTRA_ID" \
+    -H "Content-Type: application/json" \
+    -d '{"quota_bytes": 1000000}' | grep -q '"quota_bytes":1000000'
+curl -s -X PUT "$API_BASE/api/projects/$EXTRA_ID" \
+    -H "Content-Type: application/json" \
+    -d '{"entry_file": "index.html"}' | grep -q '"quota_bytes":1000000'
+curl -s -X PUT "$API_BASE/api/projects/$EXTRA_ID" \
+    -H "Content-Type: application/json" \
+    -d '{"quota_bytes": null}' | grep -q '"quota_bytes":null'
+test_result "Quota reset with null"
+
+# 30. Test an online backup snapshot of the running server
+echo ""
+echo "30. Testing backup snapshot..."
+if [ -f "$DATA_DIR/framebox.db" ]; then
+    SNAPSHOT_DIR=$(DATA_DIR="$DATA_DIR" "$PYTHON" main.py backup | sed -n 's/^Snapshot .* written to \(.*\): .*/\1/p')
+    "$PYTHON" - "$SNAPSHOT_DIR" "$EXTRA_ID" <<'PY'
+import sqlite3, sys
+from pathlib import Path
+snapshot, project_id = Path(sys.argv[1]), sys.argv[2]
+conn = sqlite3.connect(f"file:{snapshot / 'framebox.db'}?mode=ro", uri=True)
+assert conn.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+archived, = conn.execute("SELECT archived FROM projects WHERE id = ?", (project_id,)).fetchone()
+filenames = [row[0] for row in conn.execute("SELECT filename FROM files WHERE project_id = ?", (project_id,))]
+assert filenames == ["index.html"], filenames
+stored = snapshot / "archive" / f"{project_id}.zip" if archived else snapshot / "projects" / project_id / "index.html"
+assert stored.is_file(), stored
+PY
+else
+    echo "   $DATA_DIR/framebox.db not found; backup needs the server's data directory"
+fi
+test_result "Backup snapshot with uploaded files"
+
+# 31. Test a replica replays a rename chain over newer state
+echo ""
+echo "31. Testing replica rename replay..."
+REPLICA_API="http://localhost:$REPLICA_PORT"
+REPLICA_DIR=/tmp/iframe-test/replica
+REPLICA_PID=""
+trap '[ -n "$REPLICA_PID" ] && kill $REPLICA_PID 2>/dev/null' EXIT
+
+primary_last_seq() {
+    curl -s "$API_BASE/api/replication/changes?after=0&limit=1" | grep -o '"last_seq":[0-9]*' | cut -d: -f2
+}
+
+start_replica() {
+    DATA_DIR="$REPLICA_DIR" PORT="$REPLICA_PORT" REPLICA_POLL_INTERVAL=0.2 \
+        "$PYTHON" main.py serve --replica-of "$API_BASE" > "$REPLICA_DIR.log" 2>&1 &
+    REPLICA_PID=$!
+}
+
+stop_replica() {
+    kill $REPLICA_PID
+    wait $REPLICA_PID 2>/dev/null || true
+    REPLICA_PID=""
+}
+
+# Wait until the replica has applied the primary's latest change without errors
+wait_for_replica() {
+    local target=$(primary_last_seq)
+    for _ in $(seq 1 100); do
+        local replica_status=$(curl -s "$REPLICA_API/api/replication/status" || true)
+        if echo "$replica_status" | grep -q "\"applied_seq\":$target," \
+                && echo "$replica_status" | grep -q '"last_error":null'; then
+            return 0
+        fi
+        sleep 0.2
+    done
+    echo "   Replica did not catch up: $replica_status"
+    return 1
+}
+
+BEFORE_SEQ=$(primary_last_seq)
+# R takes a name and moves on; S takes the same name afterwards
+R_ID=$(curl -s -X POST "$API_BASE/api/projects" \
+    -H "Content-Type: application/json" \
+    -d "{\"name\": \"$PROJECT_NAME-r\"}" | grep -o '"id":"[^"]*"' | cut -d'"' -f4)
+for NAME in "$PROJECT_NAME-n" "$PROJECT_NAME-m"; do
+    curl -s -X PUT "$API_BASE/api/projects/$R_ID" \
+        -H "Content-Type: application/json" \
+        -d "{\"name\": \"$NAME\"}" > /dev/null
+done
+S_ID=$(curl -s -X POST "$API_BASE/api/projects" \
+    -H "Content-Type: application/json" \
+    -d "{\"name\": \"$PROJECT_NAME-s\"}" | grep -o '"id":"[^"]*"' | cut -d'"' -f4)
+curl -s -X PUT "$API_BASE/api/projects/$S_ID" \
+    -H "Content-Type: application/json" \
+    -d "{\"name\": \"$PROJECT_NAME-n\"}" > /dev/null
+
+# Sync a fresh replica, then rewind it so the chain is replayed over its final state
+rm -rf "$REPLICA_DIR"  # Left over by an interrupted run
+mkdir -p "$REPLICA_DIR"
+start_replica
+wait_for_replica
+stop_replica
+"$PYTHON" - "$REPLICA_DIR/framebox.db" "$BEFORE_SEQ" <<'PY'
+import sqlite3, sys
+with sqlite3.connect(sys.argv[1]) as conn:
+    conn.execute("UPDATE replica_state SET value = ? WHERE key = 'applied_seq'", (sys.argv[2],))
+PY
+start_replica
+wait_for_replica
+curl -s "$REPLICA_API/api/projects/$R_ID" | grep -q "\"name\":\"$PROJECT_NAME-m\""
+curl -s "$REPLICA_API/api/projects/$S_ID" | grep -q "\"name\":\"$PROJECT_NAME-n\""
+stop_replica
+test_result "Replica rename replay"
+
+# 32. Test precompressed UI assets honor Accept-Encoding q-values
+echo ""
+echo "32. Testing Accept-Encoding negotiation..."
+curl -sI -H "Accept-Encoding: gzip" "$API_BASE$ASSET" | grep -qi '^content-encoding: gzip'
+if curl -sI -H "Accept-Encoding: gzip;q=0, identity" "$API_BASE$ASSET" | grep -qi '^content-encoding:'; then
+    false
+fi
+test_result "Encodings refused with q=0 are not served"
+
+# 33. Test a bulk import run twice imports nothing the second time
+echo ""
+echo "33. Testing resumable bulk import..."
+IMPORT_ID=""
+LINK_ID=""
+if [ -f "$DATA_DIR/framebox.db" ]; then
+    rm -rf /tmp/iframe-test/import /tmp/iframe-test/import-link  # Left over by an interrupted run
+    mkdir -p "/tmp/iframe-test/import/$PROJECT_NAME-import/assets"
+    cp /tmp/iframe-test/index.html "/tmp/iframe-test/import/$PROJECT_NAME-import/"
+    echo "body { margin: 0; }" > "/tmp/iframe-test/import/$PROJECT_NAME-import/assets/style.css"
+    DATA_DIR="$DATA_DIR" "$PYTHON" main.py import /tmp/iframe-test/import | grep -q '^Imported 2 files'
+    DATA_DIR="$DATA_DIR" "$PYTHON" main.py import /tmp/iframe-test/import | grep -q '^Imported 0 files'
+    IMPORT_ID=$(curl -s "$API_BASE/api/projects/$PROJECT_NAME-import" | grep -o '"id":"[^"]*"' | cut -d'"' -f4)
+    curl -s "$API_BASE/view/$IMPORT_ID/" | grep -q "Test Project"
+
+    # An upload over a hard-linked file must leave the source tree untouched
+    mkdir -p "/tmp/iframe-test/import-link/$PROJECT_NAME-linked"
+    echo "original" > "/tmp/iframe-test/import-link/$PROJECT_NAME-linked/index.html"
+    DATA_DIR="$DATA_DIR" "$PYTHON" main.py import --link /tmp/iframe-test/import-link | grep -q '^Imported 1 files'
+    LINK_ID=$(curl -s "$API_BASE/api/projects/$PROJECT_NAME-linked" | grep -o '"id":"[^"]*"' | cut -d'"' -f4)
+    curl -s -X POST "$API_BASE/api/projects/$LINK_ID/files" \
+        -F "files=@/tmp/iframe-test/index.html" > /dev/null
+    curl -s "$API_BASE/view/$LINK_ID/" | grep -q "Test Project"
+    grep -qx "original" "/tmp/iframe-test/import-link/$PROJECT_NAME-linked/index.html"
+else
+    echo "   $DATA_DIR/framebox.db not found; import needs the server's data directory"
+fi
+test_result "Import skips an already imported tree and leaves linked sources intact"
+
+# 34. Test replication file reads cannot leave the project directory
+echo ""
+echo "34. Testing replication file path traversal..."
+for TRAVERSAL in "%2E%2E/framebox.db" "%2E%2E/logs/access.log" "$EXTRA_ID/%2E%2E/%2E%2E/framebox.db"; do
+    HTTP_CODE=$(curl -s --path-as-is -o /dev/null -w "%{http_code}" "$API_BASE/api/replication/files/$TRAVERSAL")
+    if [ "$HTTP_CODE" = "200" ]; then
+        echo "   $TRAVERSAL returned 200"
+        false
+    fi
+done
+test_result "Replication files confined to projects"
+
 # Cleanup
+curl -s -X DELETE "$API_BASE/api/projects/$R_ID" > /dev/null
+curl -s -X DELETE "$API_BASE/api/projects/$S_ID" > /dev/null
+for ID in $IMPORT_ID $LINK_ID; do
+    curl -s -X DELETE "$API_BASE/api/projects/$ID" > /dev/null
+done
+curl -s -X DELETE "$API_BASE/api/projects/$EXTRA_ID" > /dev/null
 rm -rf /tmp/iframe-test
 
 echo ""